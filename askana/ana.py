@@ -10,6 +10,7 @@ from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
 from openai import OpenAI
+from utils import llm
 from utils.logger import logger  # your project logger
 
 
@@ -21,12 +22,8 @@ BASE_DIR: Path = Path(__file__).resolve().parent.parent
 DOTENV_PATH = BASE_DIR / ".env"
 load_dotenv(DOTENV_PATH.as_posix())
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    logger.error("OPENAI_API_KEY is not set in the environment.")
-
-# Single, shared OpenAI client (can be overridden in answer_ask_ana)
-client = OpenAI(api_key=OPENAI_API_KEY)
+# The OpenAI client is the project-wide one from utils.llm
+# (can be overridden in answer_ask_ana)
 
 
 # =========================
@@ -212,15 +209,11 @@ def answer_ask_ana(
         # If braces used for something else, append cleanly.
         user_prompt = f"{user_prompt_template}\n\nQuestion:\n{question.strip()}"
 
-    # OpenAI client
-    api = client_override or client
-    if api is None:
-        logger.error("OpenAI client not available.")
-        return {"status": "error", "data": "OpenAI client not available."}
-
     logger.info("Requesting completion from model: %s", model_name)
     try:
-        completion = api.chat.completions.create(
+        completion = llm.chat_completion(
+            "ana.answer",
+            client=client_override,
             model=model_name,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -0,0 +1,96 @@
+"""
+Calibrate the local AI-likeness pre-grader against LLM grades.
+
+    python -m benchmarks.bench_pregrader                 # report on assets/grade_calibration.csv
+    python -m benchmarks.bench_pregrader --regrade 20    # LLM-grade 20 past posts first (costs API calls)
+    python -m benchmarks.bench_pregrader --threshold 40
+
+Reports local scoring speed on past posts, agreement with the LLM grader
+and, per margin, how many LLM calls the pre-grader would skip (drafts scored
+above threshold + margin) and how many of those the LLM would have accepted.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from utils import editor
+from utils.db_utils import db_session
+
+
+def _past_posts(limit: int) -> list:
+    with db_session() as conn:
+        rows = conn.execute(
+            "SELECT content FROM posted_articles WHERE content IS NOT NULL "
+            "ORDER BY dt_published DESC LIMIT ?", (limit,)
+        ).fetchall()
+    return [r[0] for r in rows if r[0] and r[0].strip()]
+
+
+def bench_speed(texts: list) -> None:
+    if not texts:
+        print("No past posts in the database; skipping speed benchmark.")
+        return
+    started = time.perf_counter()
+    for text in texts:
+        editor.local_ai_score(text)
+    elapsed = time.perf_counter() - started
+    words = sum(len(t.split()) for t in texts)
+    print(f"Local scoring: {len(texts)} posts, {words} words, "
+          f"{elapsed * 1000 / len(texts):.2f} ms/post")
+
+
+def regrade(texts: list) -> None:
+    """LLM-grade past posts and append the pairs to the calibration file."""
+    for i, text in enumerate(texts, 1):
+        features = editor.local_features(text)
+        local = editor.local_ai_score(text, features)
+        llm_score = editor.grade_base(text)
+        editor._record_calibration(local, llm_score, features)
+        print(f"[{i}/{len(texts)}] local {local} | llm {llm_score}")
+
+
+def report(threshold: int) -> None:
+    if not editor.CALIBRATION_PATH.exists():
+        print(f"No calibration data at {editor.CALIBRATION_PATH}. "
+              "Run with --regrade N or set PREGRADE_CALIBRATE=1 for a few runs.")
+        return
+    df = pd.read_csv(editor.CALIBRATION_PATH)
+    if len(df) < 2:
+        print("Need at least two calibration pairs.")
+        return
+
+    print(f"\nCalibration pairs: {len(df)}")
+    print(f"Pearson  r: {df['local_score'].corr(df['llm_score']):.3f}")
+    print(f"Spearman r: {df['local_score'].rank().corr(df['llm_score'].rank()):.3f}")
+    print(f"MAE       : {(df['local_score'] - df['llm_score']).abs().mean():.1f}")
+
+    print("\nFeature correlation with LLM grade:")
+    for name in editor.FEATURE_ANCHORS:
+        if name in df:
+            print(f"  {name:<18} {df[name].corr(df['llm_score']):+.3f}")
+
+    print(f"\nThreshold {threshold}: margin | LLM calls skipped | LLM would have accepted among skipped")
+    llm_pass = df["llm_score"] <= threshold
+    for margin in (5, 10, 15, 20, 25, 30):
+        skipped = df["local_score"] > threshold + margin  # only clearly-bad drafts skip the LLM
+        wrong = (skipped & llm_pass).sum()
+        print(f"  {margin:>6} | {skipped.mean():>17.0%} | {wrong:>3} of {skipped.sum()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=int, default=40, help="refine_article threshold (main.py uses 40)")
+    parser.add_argument("--regrade", type=int, default=0, help="LLM-grade this many past posts first")
+    parser.add_argument("--posts", type=int, default=200, help="past posts used for the speed benchmark")
+    args = parser.parse_args()
+
+    texts = _past_posts(max(args.posts, args.regrade))
+    bench_speed(texts[:args.posts])
+    if args.regrade:
+        regrade(texts[:args.regrade])
+    report(args.threshold)
+
+
+if __name__ == "__main__":
+    main()
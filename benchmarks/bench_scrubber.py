@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for the compiled boilerplate scrubber.
+
+    python -m benchmarks.bench_scrubber                  # 10,000 phrases
+    python -m benchmarks.bench_scrubber --phrases 50000
+
+Builds synthetic <language>.txt / <language>.flag.txt phrase files and runs
+the shipped matchers from utils.scrubber.get_matcher() on them: the default
+one, which deletes sentence-opening lead-ins, and the flags=True one, which
+only reports stock phrases. The scrub is compared with the old approach of
+one re.sub per phrase (anchored at sentence starts, so both do the same job),
+and the phrase words each approach leaves behind are counted (only the
+mid-sentence ones should remain).
+"""
+import argparse
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from utils import scrubber
+
+WORDS = (
+    "the a of in on for with amid over under growing mounting significant crucial pivotal broader "
+    "stakes tensions concerns pressure landscape implications reminder testament shift turning point "
+    "officials markets leaders community region economy policy talks deal crisis response move bid "
+    "remains continues signals underscores highlights raises sparks marks plays navigates"
+).split()
+SENTENCE_START = r"(?:^|(?<=[.!?] ))"
+
+
+def make_phrases(n: int, rng: random.Random) -> list:
+    phrases = set()
+    while len(phrases) < n:
+        phrases.add(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 6))))
+    return sorted(phrases)
+
+
+def make_article(phrases: list, rng: random.Random, sentences: int = 60, hits: int = 20) -> tuple:
+    """Sentences of filler words (all ending in "x", never part of a phrase); `hits`
+    phrases open a sentence as lead-ins and as many more sit mid-sentence."""
+    body = [[rng.choice(WORDS) + "x" for _ in range(rng.randint(8, 16))] for _ in range(sentences)]
+    leads, inner = rng.sample(phrases, hits), rng.sample(phrases, hits)
+    for i, phrase in zip(rng.sample(range(sentences), hits), leads):
+        body[i].insert(0, phrase + ",")
+    for i, phrase in zip(rng.sample(range(sentences), hits), inner):
+        body[i].insert(rng.randrange(1, len(body[i])), phrase)
+    text = " ".join(" ".join(words).capitalize() + "." for words in body)
+    return text, sum(len(p.split()) for p in inner)
+
+
+def _timed(fn, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def _words_left(text: str) -> int:
+    """Phrase words still in `text` (filler words end in "x")."""
+    return sum(not w.rstrip(".,").endswith("x") for w in text.split())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phrases", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20, help="scrub runs averaged for the compiled matcher")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    phrases = make_phrases(args.phrases, rng)
+    article, inner_words = make_article(phrases, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("en.txt", "en.flag.txt"):
+            (Path(tmp) / name).write_text("\n".join(phrases), encoding="utf-8")
+        scrubber.PHRASES_DIR = Path(tmp)
+        matcher = scrubber.get_matcher("en")               # what scrub_boilerplate() uses
+        flagger = scrubber.get_matcher("en", flags=True)   # what flag_boilerplate() uses
+
+        _, compile_s = _timed(matcher.regex, 1)
+        flagger.regex()
+        (compiled_text, matches), scrub_s = _timed(lambda: matcher.scrub(article), args.repeat)
+        flagged, flag_s = _timed(lambda: flagger.find(article), args.repeat)
+
+        def naive():
+            text = article
+            for phrase in phrases:
+                text = re.sub(SENTENCE_START + re.escape(phrase) + r"(?!\w),?\s*", "", text, flags=re.IGNORECASE)
+            return text
+
+        naive_text, naive_s = _timed(naive, 1)
+
+    print(f"Phrases            : {len(phrases)}")
+    print(f"Article            : {len(article.split())} words, {len(matches)} lead-ins removed, {len(flagged)} phrases flagged")
+    print(f"Compile (once)     : {compile_s * 1000:.1f} ms")
+    print(f"Compiled scrub     : {scrub_s * 1000:.2f} ms/article")
+    print(f"Compiled flag pass : {flag_s * 1000:.2f} ms/article")
+    print(f"re.sub per phrase  : {naive_s * 1000:.1f} ms/article ({naive_s / scrub_s:.0f}x slower than the scrub)")
+    # Only the mid-sentence phrases should survive the scrub
+    left = [_words_left(t) for t in (compiled_text, naive_text)]
+    print(f"Phrase words left  : compiled {left[0]}, re.sub per phrase {left[1]} (expected {inner_words}, mid-sentence)")
+
+
+if __name__ == "__main__":
+    main()
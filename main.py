@@ -1,15 +1,21 @@
 import pandas as pd
 from pathlib import Path
 import datetime
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from utils.logger import logger
+from utils import http_client, llm, rate_limit
 from utils.scraper import research, scrapeRSS, fetchNews
 from utils.telegram_scraper import fetchTelegram
-from utils.poster import upload_featured_image, post_to_wordpress
-from utils.db_utils import DB_PATH, backup_sqlite, connect, save_generated_article
+from utils import outbox
+from utils.db_utils import DB_PATH, backup_sqlite, connect
 from utils.editor import refine_article
-from utils.image import process_image
-from utils.translator import translate_post_content, load_language_config, _get_lang_code, _get_text
+from utils.dedup import dedupe_research
+from utils.pipeline import Checkpoint, Stage, run_stages
+from utils.image import cleanup_images, process_image
+from utils.translator import translate_post_contents, load_language_config, log_translation_memory_stats, _get_lang_code, _get_text
 
 from prompts.prompter import build_news_prompt, build_history_prompt
 from prompts.writer import write_article, summarize_article, generate_article_title
@@ -22,6 +28,10 @@ backup_path: Path = DB_PATH.with_name("backup_articles.db")
 backup_sqlite(DB_PATH, backup_path)
 logger.info(f"Startup backup OK → {backup_path}")
 
+# Publish anything a previous run finished but could not post
+outbox.drain()
+cleanup_images()  # featured images from runs older than IMAGE_RETENTION_DAYS
+
 
 # Weekly Schedule
 schedule_sheet = pd.read_excel(
@@ -48,108 +58,111 @@ sources = [s for s in sources if s["bool_visibility"]==True]
 # Translation Settings
 excel_file = Path("blog_config.xlsx")  # adjust if stored elsewhere
 supported_languages = load_language_config(excel_file)
+supported_languages = [lang for lang in supported_languages if lang["run"]]
 
+# Topics run in a worker pool; OpenAI, SerpAPI and WordPress calls draw from
+# shared budgets (utils/rate_limit.py), so more workers never means more load per service.
+TOPIC_CONCURRENCY = max(1, int(os.getenv("TOPIC_CONCURRENCY", "3")))
 
-# Initializing script...
-for topic in topic_agenda:
+
+def _slug(text: str) -> str:
+    """Filesystem-safe topic name for draft files (topics may run at the same minute)."""
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-") or "topic"
+
+
+def run_topic(topic: str) -> None:
+    """Research, write, edit, translate and publish one topic (checkpointed per stage)."""
     logger.info("Topic pool, topic: {}".format(topic))
     
     # === Research and News Curration ===
-    temp_research_db = []
-    filtered_sources = [s for s in sources if s["desc_topic_primary"]==topic]
-    for source in filtered_sources:
-        channel = source["desc_channel"]
-
-        if channel == "SERP":
-            SERP_articles = research(source["desc_payload"], source["desc_topic_primary"], source["limit"])
-            if len(SERP_articles) > 0:
-                temp_research_db.extend(SERP_articles)
-
-        elif channel == "RSS":
-            RSS_articles = scrapeRSS(source["desc_payload"], source["desc_topic_primary"], source["limit"])
-            if len(RSS_articles) > 0:
-                temp_research_db.extend(RSS_articles)
-
-        elif channel == "News":
-            news_articles = fetchNews(source)
-            if len(news_articles) > 0:
-                temp_research_db.extend(news_articles)
-        
-        elif channel == "Telegram":
-            telegram_messages = fetchNews(source)
-            if len(telegram_messages) > 0:
-                temp_research_db.extend(telegram_messages)
-
-        else:
-            logger.info("Channel unrecognized: {}".format(channel))
-            pass
-    
-    # === Article Generation ===
-    news = build_news_prompt(temp_research_db, 10000)
-    past_works = build_history_prompt(topic, limit=10)
+    def _research():
+        temp_research_db = []
+        filtered_sources = [s for s in sources if s["desc_topic_primary"]==topic]
+        for source in filtered_sources:
+            channel = source["desc_channel"]
+            collected_before = len(temp_research_db)
+
+            if channel == "SERP":
+                SERP_articles = research(source["desc_payload"], source["desc_topic_primary"], source["limit"])
+                if len(SERP_articles) > 0:
+                    temp_research_db.extend(SERP_articles)
+
+            elif channel == "RSS":
+                RSS_articles = scrapeRSS(source["desc_payload"], source["desc_topic_primary"], source["limit"])
+                if len(RSS_articles) > 0:
+                    temp_research_db.extend(RSS_articles)
+
+            elif channel == "News":
+                news_articles = fetchNews(source)
+                if len(news_articles) > 0:
+                    temp_research_db.extend(news_articles)
+            
+            elif channel == "Telegram":
+                telegram_messages = fetchNews(source)
+                if len(telegram_messages) > 0:
+                    temp_research_db.extend(telegram_messages)
 
-    article_text, article_prompt = write_article(news,past_works)
-    summary, tags = summarize_article(article_text)
-    title = generate_article_title(article_text)
+            else:
+                logger.info("Channel unrecognized: {}".format(channel))
+                pass
 
-    # === Editor ===
-    article_text = refine_article(article_text, limit=5, threshold=40)
+            # Carry the source's quality weight so the prompt packer can rank items
+            for item in temp_research_db[collected_before:]:
+                item.setdefault("score_quality", source.get("score_quality"))
+        return temp_research_db
     
-    # === Translation ===
-    supported_languages = [lang for lang in supported_languages if lang["run"]]
-    translated_articles = []
-
-    for language in supported_languages:
-        translated_title, translated_article = translate_post_content(
-            title_en=title, 
-            body_en=article_text, 
-            lang=language["lang"])
-
-        #We are going to need this variable later.
-        translation = {
-            "title" : translated_title,
-            "body" : translated_article,
-            "language" : language["code"]}
-
-        translated_articles.append(translation)
-
-        drafts_dir = Path(__file__).resolve().parent / "drafts/{}".format(language["code"])
-        drafts_dir.mkdir(exist_ok=True)  # create folder if it doesn't exist
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-        file_path = drafts_dir / f"{timestamp}.txt"
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(translated_title + "\n\n")      # Title at the top
-            f.write(translated_article + "\n\n")  
-            f.write("Tags: " + ", ".join(tags) + "\n\n")
-
-    logger.info(f"Draft saved: {file_path}")
-
-    # === Save draft for debugging (English) ===
-    drafts_dir = Path(__file__).resolve().parent / "drafts/EN"
-    drafts_dir.mkdir(exist_ok=True)  # create folder if it doesn't exist
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-    file_path = drafts_dir / f"{timestamp}.txt"
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(title + "\n\n")      # Title at the top
-        f.write(article_text + "\n\n")  
-        f.write("Tags: " + ", ".join(tags) + "\n\n")
-        f.write("Summary:\n" + summary + "\n")
+    # === Article Generation ===
+    def _write(temp_research_db):
+        temp_research_db = dedupe_research(temp_research_db)  # one copy per wire story
+        news = build_news_prompt(temp_research_db, 10000, mode="value")
+        past_works = build_history_prompt(topic, limit=10)
 
-    logger.info(f"Draft saved: {file_path}")
+        article_text, article_prompt = write_article(news, past_works, topic=topic)
+        return article_text
 
-    # === Image Generation ===
+    # Image prompt for this topic (falls back to "General")
     d = pd.read_excel("blog_config.xlsx", sheet_name="image_prompts").to_dict(orient='records')
     image_prompt = next(
         (item["desc_image_prompt"] for item in d if item["desc_topic_primary"] == topic),
         next((item["desc_image_prompt"] for item in d if item["desc_topic_primary"] == "General"), None)
     )
-    featured_image = process_image(
-        article_summary=summary,
-        system_prompt=image_prompt)
 
-    image_id = None
-    if featured_image == True:
-        image_id = upload_featured_image("assets/featured_image.jpg")
+    # === Translation ===
+    def _translate_all(title, article_text, summary_and_tags):
+        _, tags = summary_and_tags
+        translated_articles = []
+
+        # All languages at once; results come back in config order
+        results = translate_post_contents(
+            title_en=title,
+            body_en=article_text,
+            languages=[language["lang"] for language in supported_languages])
+
+        for language, result in zip(supported_languages, results):
+            if result is None:
+                continue  # already logged; the other languages still go out
+            translated_title, translated_article = result
+
+            #We are going to need this variable later.
+            translation = {
+                "title" : translated_title,
+                "body" : translated_article,
+                "language" : language["code"]}
+
+            translated_articles.append(translation)
+
+            drafts_dir = Path(__file__).resolve().parent / "drafts/{}".format(language["code"])
+            drafts_dir.mkdir(exist_ok=True)  # create folder if it doesn't exist
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+            file_path = drafts_dir / f"{timestamp}_{_slug(topic)}.txt"
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(translated_title + "\n\n")      # Title at the top
+                f.write(translated_article + "\n\n")  
+                f.write("Tags: " + ", ".join(tags) + "\n\n")
+
+            logger.info(f"Draft saved: {file_path}")
+
+        return translated_articles
 
     # === Posting to WordPress (multi-language with Polylang linking) ===
 
@@ -169,106 +182,146 @@ for topic in topic_agenda:
                 return item[k]
         return None
 
-    posted_ids: dict[str, int] = {}   # e.g. {"en": 123, "de": 456, ...}
-    
-    # 1) Post English base article first (so other languages can link to it)
-    base_response = post_to_wordpress(
-        title=title,
-        content=article_text,
-        featured_image_id=image_id,
-        tags=tags,
-        categories=[topic],
-        language="en",                # ensure EN is the canonical source
-        translations=None,            # nothing to link yet
-    )
+    # === Featured image (uploaded by the outbox when the group is published) ===
+    def _image(summary_and_tags):
+        # Each image gets its own content-hashed file, so topics generate images in parallel
+        return process_image(article_summary=summary_and_tags[0], system_prompt=image_prompt)
 
-    if base_response is not None:
-        en_id = int(base_response.get("id"))
-        posted_ids["en"] = en_id
+    def _publish(title, summary_and_tags, article_text, translated_articles, image_path):
+        summary, tags = summary_and_tags
+        if image_path and not Path(image_path).is_file():
+            logger.warning(f"Checkpointed image {image_path} is gone; publishing without a featured image.")
+            image_path = None
 
-        dt_published = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        save_generated_article(
+        # 1) Collect the English base post and its translations, then publish them as
+        #    one group: EN first, siblings concurrently (or in one batch), one linking pass
+        base_post = dict(
             title=title,
             content=article_text,
+            tags=tags,
+            categories=[topic],
+            language="en",                # ensure EN is the canonical source
+        )
+
+        sibling_posts = []
+        for item in translated_articles:
+            code = _get_lang_code(item)
+            if not code:
+                logger.warning("Skipping translation without a valid language code: %s", item)
+                continue
+
+            # Pull translated fields with graceful fallbacks
+            t_title = _get_text(item, "title", "headline") or title
+            t_body = _get_text(item, "content", "body", "text")
+            if not t_body:
+                logger.warning("Skipping %s translation without content/body.", code)
+                continue
+
+            t_tags = item.get("tags", tags) or tags  # reuse EN tags if not provided
+
+            sibling_posts.append(dict(
+                title=t_title,
+                content=t_body,
+                tags=t_tags,
+                categories=[topic],
+                language=code,                  # Polylang language slug/code (e.g., "de", "ru", "fr")
+            ))
+
+        # The finished group goes through the durable outbox: if WordPress is down,
+        # a later run publishes it without regenerating anything.
+        entry_id = outbox.enqueue(
+            base_post,
+            sibling_posts,
             topic=topic,
-            category=topic,
-            summary=summary,
-            link=base_response.get("link"),
-            dt_published=dt_published,
+            image_path=image_path,              # same featured image for every language
+            record=dict(title=title, content=article_text, topic=topic, category=topic, summary=summary),
         )
+        return {"entry_id": entry_id, "posts": outbox.publish(entry_id), "siblings": sibling_posts}
+
+    # === Research → Article → Title ‖ Summary → Image ‖ Editor → Translations → Publish ===
+    # Title, summary and editor only need the draft, and the image only the
+    # summary, so they run concurrently; the topic takes its critical path.
+    # Every finished stage is checkpointed, so a rerun today resumes where this one stopped.
+    outputs = run_stages([
+        Stage("research", _research),
+        Stage("article", _write, deps=("research",)),
+        Stage("title", generate_article_title, deps=("article",)),
+        Stage("summary", summarize_article, deps=("article",)),
+        Stage("image", _image, deps=("summary",)),
+        Stage("editor", lambda draft: refine_article(draft, limit=5, threshold=40, rewrite_scope="paragraphs"), deps=("article",)),
+        Stage("translations", _translate_all, deps=("title", "editor", "summary")),
+        Stage("publish", _publish, deps=("title", "summary", "editor", "translations", "image")),
+    ], checkpoint=Checkpoint(datetime.date.today().isoformat(), topic))
+    title = outputs["title"]
+    summary, tags = outputs["summary"]
+    article_text = outputs["editor"]
+
+    # === Save draft for debugging (English) ===
+    drafts_dir = Path(__file__).resolve().parent / "drafts/EN"
+    drafts_dir.mkdir(exist_ok=True)  # create folder if it doesn't exist
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    file_path = drafts_dir / f"{timestamp}_{_slug(topic)}.txt"
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(title + "\n\n")      # Title at the top
+        f.write(article_text + "\n\n")
+        f.write("Tags: " + ", ".join(tags) + "\n\n")
+        f.write("Summary:\n" + summary + "\n")
+
+    logger.info(f"Draft saved: {file_path}")
 
+    published = outputs["publish"]["posts"]
+    base_response = published.get("en")
+
+    if base_response is not None:
         # Optional: store an EN draft alongside translated drafts for parity
         en_dir = Path(__file__).resolve().parent / "drafts/EN"
         en_dir.mkdir(exist_ok=True)
         ts = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-        with open(en_dir / f"{ts}.txt", "w", encoding="utf-8") as f:
+        with open(en_dir / f"{ts}_{_slug(topic)}.txt", "w", encoding="utf-8") as f:
             f.write(title + "\n\n")
             f.write(article_text + "\n\n")
             f.write("Tags: " + ", ".join(tags) + "\n\n")
             f.write("Summary:\n" + summary + "\n")
 
     else:
-        logger.error("English base post failed; skipping translations.")
-        print("Done")
-        raise SystemExit(1)
-
-    # 2) Post each translated article and link it to all previously posted siblings
-    for item in translated_articles:
-        code = _get_lang_code(item)
-        if not code:
-            logger.warning("Skipping translation without a valid language code: %s", item)
-            continue
+        logger.error(f"English base post failed; outbox entry #{outputs['publish']['entry_id']} will be retried on the next run.")
+        return
 
-        # Pull translated fields with graceful fallbacks
-        t_title = _get_text(item, "title", "headline") or title
-        t_body = _get_text(item, "content", "body", "text")
-        if not t_body:
-            logger.warning("Skipping %s translation without content/body.", code)
+    # 2) Save an on-disk draft for every translation that was published
+    for post in outputs["publish"]["siblings"]:
+        code = post["language"]
+        if published.get(code) is None:
             continue
 
-        #t_summary = _get_text(item, "summary", "abstract") or summary
-        t_tags = item.get("tags", tags) or tags  # reuse EN tags if not provided
-
-        response = post_to_wordpress(
-            title=t_title,
-            content=t_body,
-            featured_image_id=image_id,     # reuse the same featured image
-            tags=t_tags,
-            categories=[topic],
-            language=code,                  # Polylang language slug/code (e.g., "de", "ru", "fr")
-            translations=posted_ids,        # link to everything posted so far (incl. EN)
-        )
-
-        if response is None:
-            logger.error("Failed to post %s translation.", code.upper())
-            continue
-
-        # Record this language’s post id (so the next languages can link to it too)
-        lang_post_id = int(response.get("id"))
-        posted_ids[code] = lang_post_id
-
-        # Save per-language DB entry and an on-disk draft
-        # dt_published = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # save_generated_article(
-        #     title=t_title,
-        #     content=t_body,
-        #     topic=topic,
-        #     category=topic,
-        #     summary=t_summary,
-        #     link=response.get("link"),
-        #     dt_published=dt_published,
-        # )
-
+        t_tags = post["tags"]
         drafts_dir = Path(__file__).resolve().parent / f"drafts/{code.upper()}"
         drafts_dir.mkdir(exist_ok=True)
         ts = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-        file_path = drafts_dir / f"{ts}.txt"
+        file_path = drafts_dir / f"{ts}_{_slug(topic)}.txt"
         with open(file_path, "w", encoding="utf-8") as f:
-            f.write(t_title + "\n\n")
-            f.write(t_body + "\n\n")
+            f.write(post["title"] + "\n\n")
+            f.write(post["content"] + "\n\n")
             if isinstance(t_tags, (list, tuple)):
                 f.write("Tags: " + ", ".join(map(str, t_tags)) + "\n\n")
             else:
                 f.write("Tags: " + str(t_tags) + "\n\n")
 
-    print("Done")
+    logger.info(f"Topic {topic!r} done")
+
+
+# Initializing script...
+with ThreadPoolExecutor(max_workers=TOPIC_CONCURRENCY, thread_name_prefix="topic") as pool:
+    futures = {pool.submit(run_topic, topic): topic for topic in topic_agenda}
+    for future in as_completed(futures):
+        try:
+            future.result()
+        except Exception as exc:  # one failed topic must not stop the others
+            logger.exception(f"Topic {futures[future]!r} failed: {exc}")
+
+print("Done")
+
+# Per-host HTTP and per-call-site OpenAI usage for this run
+http_client.log_stats()
+llm.log_usage()
+rate_limit.log_stats()
+log_translation_memory_stats()
@@ -1,6 +1,9 @@
 import os
 import sys
+import math
+from functools import lru_cache
 import tiktoken
+import numpy as np
 import pandas as pd
 from utils.logger import logger
 
@@ -9,16 +12,27 @@ from utils.db_utils import fetch_posts
 
 
 # Tiktoken
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """Load the tokenizer once per process; get_encoding() is not free."""
+    return tiktoken.get_encoding("cl100k_base")
+
+
 def count_tokens(text: str) -> int:
-    encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
+    return len(_get_encoding().encode(text))
+
+
+@lru_cache(maxsize=None)
+def _load_template(file_name: str) -> str:
+    """Read a prompt template from this folder once and keep it in memory."""
+    template_path = os.path.join(os.path.dirname(__file__), file_name)
+    with open(template_path, "r", encoding="utf-8") as file:
+        return file.read()
 
 
 # News History
 def fill_news_article_template(number, title, source, content):
-    template_path = os.path.join(os.path.dirname(__file__), "article_template.txt")
-    with open(template_path, "r", encoding="utf-8") as file:
-        template = file.read()
+    template = _load_template("article_template.txt")
     filled_article = template.format(
         number=number,
         title=title,
@@ -28,34 +42,147 @@ def fill_news_article_template(number, title, source, content):
     return filled_article
 
 
-def build_news_prompt(research_list, max_token_limit=10000):
+def _source_label(item) -> str:
+    """'source (channel)', or every outlet that carried a deduplicated story."""
+    sources = item.get("sources")
+    if isinstance(sources, list) and sources:
+        return ", ".join(sources)
+    return "{} ({})".format(item["source"], item["channel"])
+
+
+def score_research_items(research: pd.DataFrame, half_life_hours: float = 24.0) -> np.ndarray:
+    """
+    Value of each research row: source quality x recency decay.
+
+    Recency halves every `half_life_hours`; quality comes from the sources
+    sheet's `score_quality` (missing values get the batch median, or 1).
+    """
+    published = pd.to_datetime(research["dt_published"], errors="coerce")
+    age_hours = (pd.Timestamp.now(tz="UTC").tz_localize(None) - published).dt.total_seconds() / 3600
+    age_hours = age_hours.clip(lower=0).fillna(age_hours.max() if age_hours.notna().any() else 0)
+
+    if "score_quality" in research:
+        quality = pd.to_numeric(research["score_quality"], errors="coerce")
+        median = quality.median()
+        quality = quality.fillna(1.0 if pd.isna(median) else median).clip(lower=0)
+    else:
+        quality = pd.Series(1.0, index=research.index)
+
+    return (quality * np.power(0.5, age_hours / half_life_hours)).to_numpy(dtype=float)
+
+
+def _knapsack(values: np.ndarray, weights: np.ndarray, capacity: int) -> list:
+    """
+    0/1 knapsack: indices of the subset with the highest total value whose
+    weights sum to at most `capacity`. Vectorized over capacities with numpy;
+    weights are coarsened (rounded up, so the budget is never exceeded) when
+    the DP table would get large.
+    """
+    n = len(values)
+    if n == 0 or capacity <= 0:
+        return []
+
+    step = max(1, math.ceil(n * (capacity + 1) / 20_000_000))
+    w = np.ceil(weights / step).astype(int)
+    cap = capacity // step
+
+    best = np.zeros(cap + 1)
+    take = np.zeros((n, cap + 1), dtype=bool)
+    for i in range(n):
+        if w[i] > cap:
+            continue
+        candidate = np.full(cap + 1, -np.inf)
+        candidate[w[i]:] = best[:cap + 1 - w[i]] + values[i]
+        take[i] = candidate > best
+        best = np.where(take[i], candidate, best)
+
+    chosen, c = [], cap
+    for i in range(n - 1, -1, -1):
+        if take[i, c]:
+            chosen.append(i)
+            c -= w[i]
+    return sorted(chosen)
+
+
+def build_news_prompt(research_list, max_token_limit=10000, mode="greedy", half_life_hours=24.0):
+    """
+    Render research items into the news section of the writer prompt.
+
+    mode:
+      - "greedy": newest first, stop at the first item that does not fit
+      - "value":  pick the subset with the most recency x quality value
+                  that fits the token budget (knapsack), then fill any
+                  budget left over newest first; rendered newest first
+    """
+    if not research_list:
+        return ""
+
     research = pd.DataFrame(research_list)
-    research = research.sort_values(by='dt_published', ascending=False).to_dict(orient='records')
+    research = research.sort_values(by='dt_published', ascending=False).reset_index(drop=True)
+    if mode == "value":
+        return _build_news_prompt_by_value(research, max_token_limit, half_life_hours)
+    research = research.to_dict(orient='records')
 
-    prompt_part_news = ""
+    # Each item is tokenized exactly once; the prompt size is a running total.
+    separator_tokens = count_tokens("\n")
+    parts = []
+    total_tokens = 0
     n = 0
     for i in research:
-        prompt_token_count = count_tokens(prompt_part_news)
-        
-        source =  "{} ({})".format(i["source"], i["channel"])
+        source = _source_label(i)
         n+=1
         more_news = fill_news_article_template(n, i["title"], source, i["content"])
         more_news_token_count = count_tokens(more_news)
-        if prompt_token_count + more_news_token_count > max_token_limit:
-            logger.info("Stopping after {} sources added. Tokens used: {}".format(n-1, more_news_token_count+prompt_token_count))
+        if total_tokens + more_news_token_count > max_token_limit:
+            logger.info("Stopping after {} sources added. Tokens used: {}".format(n-1, more_news_token_count+total_tokens))
             break
-        
-        prompt_part_news += more_news
-        prompt_part_news += "\n"
 
-    return prompt_part_news
+        parts.append(more_news)
+        total_tokens += more_news_token_count + separator_tokens
+
+    return "".join(part + "\n" for part in parts)
+
+
+def _build_news_prompt_by_value(research, max_token_limit, half_life_hours):
+    values = score_research_items(research, half_life_hours)
+
+    # Token cost per item; numbered by position, and re-numbering the chosen
+    # subset only lowers numbers, so costs never grow after selection.
+    records = research.to_dict(orient='records')
+    rendered = [
+        fill_news_article_template(n, i["title"], _source_label(i), i["content"])
+        for n, i in enumerate(records, start=1)
+    ]
+    separator_tokens = count_tokens("\n")
+    weights = np.array(
+        [len(t) + separator_tokens for t in _get_encoding().encode_ordinary_batch(rendered)]
+    )
+
+    chosen = _knapsack(values, weights, max_token_limit)
+
+    # Zero-value items (score_quality 0) never win the knapsack; like greedy
+    # mode, still use any budget left over on them, newest first.
+    picked = set(chosen)
+    left = max_token_limit - int(weights[chosen].sum()) if chosen else max_token_limit
+    for idx in range(len(records)):
+        if idx not in picked and weights[idx] <= left:
+            picked.add(idx)
+            left -= int(weights[idx])
+    chosen = sorted(picked)
+
+    parts = []
+    for n, idx in enumerate(chosen, start=1):
+        i = records[idx]
+        parts.append(fill_news_article_template(n, i["title"], _source_label(i), i["content"]))
+
+    logger.info("Packed {} of {} sources by value. Tokens used: {} of {}".format(
+        len(chosen), len(records), int(weights[chosen].sum()) if chosen else 0, max_token_limit))
+    return "".join(part + "\n" for part in parts)
 
 # Post History
 def fill_post_template(number, title, summary):
-    template_path = os.path.join(os.path.dirname(__file__), "past_article_template.txt")
-    with open(template_path, "r", encoding="utf-8") as file:
-        template = file.read()
-    
+    template = _load_template("past_article_template.txt")
+
     filled_article = template.format(
         number=number,
         title=title,
@@ -4,8 +4,9 @@ import unicodedata
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
+from utils import llm
 import re
+import uuid
 from typing import Optional, List, Tuple
 
 
@@ -14,13 +15,6 @@ base_dir = Path(__file__).resolve().parent.parent
 dotenv_path = os.path.join(base_dir, ".env")
 load_dotenv(dotenv_path)
 
-# OpenAI client
-openai_key = os.getenv("OPENAI_API_KEY")
-if not openai_key:
-    logger.error("OPENAI_API_KEY is not set in the environment.")
-
-client = OpenAI(api_key=openai_key)
-
 
 # === Helpers ===
 def clean_text(text: str) -> str:
@@ -31,10 +25,11 @@ def clean_text(text: str) -> str:
 
 
 # === Main Functions ===
-def write_article(research: str, post_history: Optional[str]):
+def write_article(research: str, post_history: Optional[str], topic: Optional[str] = None):
     """
     Fill the article-writing template with research and past history,
     save the filled prompt, and call OpenAI to generate the article.
+    `topic` goes into the prompt log's file name (topics are written in parallel).
 
     Returns:
         tuple[str, str]: (generated_article, saved_prompt_path)
@@ -78,7 +73,8 @@ def write_article(research: str, post_history: Optional[str]):
     os.makedirs(save_dir, exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"article_prompt_{timestamp}.txt"
+    topic_slug = re.sub(r"[^a-z0-9]+", "-", str(topic or "").lower()).strip("-") or "article"
+    filename = f"article_prompt_{timestamp}_{topic_slug}_{uuid.uuid4().hex[:8]}.txt"
     file_path = os.path.join(save_dir, filename)
 
     try:
@@ -102,7 +98,8 @@ def write_article(research: str, post_history: Optional[str]):
     # Call OpenAI
     logger.info("Requesting article from OpenAI API...")
     try:
-        response = client.chat.completions.create(
+        response = llm.chat_completion(
+            "writer.article",
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -131,7 +128,8 @@ def generate_article_title(article_text: str) -> str:
     )
 
     try:
-        response = client.chat.completions.create(
+        response = llm.chat_completion(
+            "writer.title",
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -172,7 +170,8 @@ def summarize_article(article_text: str) -> Tuple[str, List[str]]:
     )
 
     try:
-        response = client.chat.completions.create(
+        response = llm.chat_completion(
+            "writer.summary",
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
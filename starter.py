@@ -7,12 +7,15 @@ import datetime
 
 from askana.ana import answer_ask_ana
 
-from utils.translator import translate_post_content,load_language_config, _get_lang_code, _get_text
-from utils.poster import upload_featured_image, post_to_wordpress
-from utils.db_utils import save_generated_article
+from utils.translator import translate_post_contents, load_language_config, log_translation_memory_stats, _get_lang_code, _get_text
+from utils import outbox
 from utils.logger import logger
+from utils import http_client, llm
 from typing import Optional
 
+# Publish anything a previous run finished but could not post
+outbox.drain()
+
 # Translation Settings
 excel_file = Path("blog_config.xlsx")  # adjust if stored elsewhere
 supported_languages = load_language_config(excel_file)
@@ -52,11 +55,16 @@ if result["status"] == "answered":
     supported_languages = [lang for lang in supported_languages if lang["run"]]
     translated_articles = []
 
-    for language in supported_languages:
-        translated_title, translated_article = translate_post_content(
-            title_en=title, 
-            body_en=filled_template, 
-            lang=language["lang"])
+    # All languages at once; results come back in config order
+    results = translate_post_contents(
+        title_en=title,
+        body_en=filled_template,
+        languages=[language["lang"] for language in supported_languages])
+
+    for language, translated in zip(supported_languages, results):
+        if translated is None:
+            continue  # already logged; the other languages still go out
+        translated_title, translated_article = translated
 
         #We are going to need this variable later.
         translation = {
@@ -75,7 +83,7 @@ if result["status"] == "answered":
             f.write(translated_article + "\n\n")  
             f.write("Tags: " + ", ".join(tags) + "\n\n")
 
-    logger.info(f"Draft saved: {file_path}")
+        logger.info(f"Draft saved: {file_path}")
 
     # Save draft for debugging (English)
     drafts_dir = Path(__file__).resolve().parent / "drafts/EN"
@@ -92,49 +100,19 @@ if result["status"] == "answered":
     image_id = 334
     
     # === Posting to WordPress (multi-language with Polylang linking) ===
-    posted_ids: dict[str, int] = {}   # e.g. {"en": 123, "de": 456, ...}
-    
-    # 1) Post English base article first (so other languages can link to it)
+    # 1) Collect the English base post and its translations, then publish them as
+    #    one group: EN first, siblings concurrently (or in one batch), one linking pass
     topic = "Ask Ana"
-    base_response = post_to_wordpress(
+    base_post = dict(
         title=title,
         content=filled_template,
         featured_image_id=image_id,
         tags=tags,
         categories=[topic],
         language="en",                # ensure EN is the canonical source
-        translations=None,            # nothing to link yet
     )
 
-    if base_response is not None:
-        en_id = int(base_response.get("id"))
-        posted_ids["en"] = en_id
-
-        dt_published = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        save_generated_article(
-            title=title,
-            content=filled_template,
-            topic=topic,
-            category=topic,
-            summary=" ",
-            link=base_response.get("link"),
-            dt_published=dt_published,
-        )
-
-        # Optional: store an EN draft alongside translated drafts for parity
-        en_dir = Path(__file__).resolve().parent / "drafts/EN"
-        en_dir.mkdir(exist_ok=True)
-        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-        with open(en_dir / f"{ts}.txt", "w", encoding="utf-8") as f:
-            f.write(title + "\n\n")
-            f.write(filled_template + "\n\n")
-
-    else:
-        logger.error("English base post failed; skipping translations.")
-        print("Done")
-        raise SystemExit(1)
-
-    # 2) Post each translated article and link it to all previously posted siblings
+    sibling_posts = []
     for item in translated_articles:
         code = _get_lang_code(item)
         if not code:
@@ -148,39 +126,62 @@ if result["status"] == "answered":
             logger.warning("Skipping %s translation without content/body.", code)
             continue
 
-        #t_summary = _get_text(item, "summary", "abstract") or summary
         t_tags = item.get("tags", tags) or tags  # reuse EN tags if not provided
 
-        response = post_to_wordpress(
+        sibling_posts.append(dict(
             title=t_title,
             content=t_body,
             featured_image_id=image_id,     # reuse the same featured image
             tags=t_tags,
             categories=[topic],
             language=code,                  # Polylang language slug/code (e.g., "de", "ru", "fr")
-            translations=posted_ids,        # link to everything posted so far (incl. EN)
-        )
+        ))
+
+    # The finished group goes through the durable outbox: if WordPress is down,
+    # the next run of main.py or starter.py publishes it without regenerating anything.
+    entry_id = outbox.enqueue(
+        base_post,
+        sibling_posts,
+        topic=topic,
+        record=dict(title=title, content=filled_template, topic=topic, category=topic, summary=" "),
+    )
+    published = outbox.publish(entry_id)
+    base_response = published.get("en")
 
-        if response is None:
-            logger.error("Failed to post %s translation.", code.upper())
-            continue
+    if base_response is not None:
+        # Optional: store an EN draft alongside translated drafts for parity
+        en_dir = Path(__file__).resolve().parent / "drafts/EN"
+        en_dir.mkdir(exist_ok=True)
+        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+        with open(en_dir / f"{ts}.txt", "w", encoding="utf-8") as f:
+            f.write(title + "\n\n")
+            f.write(filled_template + "\n\n")
 
-        # Record this language’s post id (so the next languages can link to it too)
-        lang_post_id = int(response.get("id"))
-        posted_ids[code] = lang_post_id
+    else:
+        logger.error(f"English base post failed; outbox entry #{entry_id} will be retried on the next run.")
+
+    # 2) Save an on-disk draft for every translation that was published
+    for post in sibling_posts:
+        code = post["language"]
+        if published.get(code) is None:
+            continue
 
+        t_tags = post["tags"]
         drafts_dir = Path(__file__).resolve().parent / f"drafts/{code.upper()}"
         drafts_dir.mkdir(exist_ok=True)
         ts = datetime.datetime.now().strftime("%Y%m%d_%H%M")
         file_path = drafts_dir / f"{ts}.txt"
         with open(file_path, "w", encoding="utf-8") as f:
-            f.write(t_title + "\n\n")
-            f.write(t_body + "\n\n")
+            f.write(post["title"] + "\n\n")
+            f.write(post["content"] + "\n\n")
             if isinstance(t_tags, (list, tuple)):
                 f.write("Tags: " + ", ".join(map(str, t_tags)) + "\n\n")
             else:
                 f.write("Tags: " + str(t_tags) + "\n\n")
 
+    http_client.log_stats()
+    llm.log_usage()
+    log_translation_memory_stats()
     print("Done")
 else:
     # already_answered | flagged_skip | error
@@ -0,0 +1,29 @@
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make `utils` / `prompts` importable and give modules that read .env at import time safe values
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("domain", "https://wp.example.test")
+os.environ.setdefault("WP_APP_PASSWORD", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from utils.logger import logger  # noqa: E402
+
+# Never append to the tracked logs/operations.log, not even while test modules import
+for _handler in [h for h in logger.handlers if isinstance(h, logging.FileHandler)]:
+    logger.removeHandler(_handler)
+    _handler.close()
+
+
+@pytest.fixture(autouse=True)
+def log_file(tmp_path):
+    """Send the shared logger's file output to tmp_path for the duration of a test."""
+    handler = logging.FileHandler(tmp_path / "operations.log", encoding="utf-8")
+    logger.addHandler(handler)
+    yield tmp_path / "operations.log"
+    logger.removeHandler(handler)
+    handler.close()
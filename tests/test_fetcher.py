@@ -0,0 +1,45 @@
+import threading
+import time
+
+from utils import fetcher
+
+
+def test_parallel_calls_share_one_per_host_budget(monkeypatch):
+    monkeypatch.setattr(fetcher, "_shared_limiter", fetcher.DomainRateLimiter())
+    starts = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        with lock:
+            starts.append(time.monotonic())
+        return url
+
+    def topic(n):
+        urls = [f"https://same-site.example/{n}/{i}" for i in range(3)]
+        fetcher.fetch_concurrently(urls, fetch, domain_delay=0.1)
+
+    threads = [threading.Thread(target=topic, args=(n,)) for n in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    starts.sort()
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert len(starts) == 6
+    assert min(gaps) >= 0.09  # two "topics", still one request per 0.1 s to the host
+
+
+def test_cache_hits_skip_the_per_host_wait(monkeypatch):
+    monkeypatch.setattr(fetcher, "_shared_limiter", fetcher.DomainRateLimiter())
+    urls = [f"https://same-site.example/{i}" for i in range(6)]
+    cached = set(urls[:5])
+
+    started = time.monotonic()
+    results = fetcher.fetch_concurrently(urls, lambda u: u, domain_delay=0.5, cached_fn=cached.__contains__)
+
+    assert results == urls
+    assert time.monotonic() - started < 0.4  # one network fetch, no queue behind cached pages
+    started = time.monotonic()
+    fetcher.fetch_concurrently(urls[5:], lambda u: u, domain_delay=0.5)
+    assert time.monotonic() - started >= 0.4  # the host's next slot is still held by that fetch
@@ -0,0 +1,86 @@
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils import db_utils, http_cache
+
+SERBIAN = "<html><body><p>Влада је усвојила закон о штедњи — čćžšđ</p></body></html>"
+
+
+def _response(body: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+    response.encoding = get_encoding_from_headers(response.headers)  # what requests would pick
+    return response
+
+
+def test_utf8_page_without_charset_header_is_not_garbled(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_PATH", tmp_path / "http_cache.db")
+    response = _response(SERBIAN.encode("utf-8"), "text/html")
+    assert response.encoding == "ISO-8859-1"  # the trap: requests' default for text/html
+    monkeypatch.setattr(http_cache.http_client, "get", lambda url, **kwargs: response)
+
+    fresh = http_cache.cached_get("https://example.rs/vesti")
+    cached = http_cache.cached_get("https://example.rs/vesti")
+
+    assert cached.from_cache
+    assert fresh.text == SERBIAN
+    assert cached.text == SERBIAN
+
+
+def test_declared_and_meta_charsets_win():
+    latin = "Café crème".encode("cp1252")
+    assert http_cache.sniff_encoding(latin, "text/html; charset=windows-1252") == "windows-1252"
+    page = b'<html><head><meta charset="windows-1251"></head>' + "Влада".encode("cp1251")
+    assert http_cache.sniff_encoding(page, "text/html") == "windows-1251"
+
+
+def test_cache_uses_the_shared_connection_and_migrations(tmp_path, monkeypatch):
+    path = tmp_path / "http_cache.db"
+    monkeypatch.setattr(http_cache, "CACHE_PATH", path)
+    monkeypatch.setattr(http_cache.http_client, "get", lambda url, **kwargs: _response(b"<p>ok</p>", "text/html"))
+
+    http_cache.cached_get("https://example.rs/a")
+    http_cache.cached_get("https://example.rs/b")
+
+    with db_utils.db_session(path) as conn:
+        assert conn is db_utils.get_connection(path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(http_cache.MIGRATIONS)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0] == 2
+
+
+def test_304_restarts_the_ttl(tmp_path, monkeypatch):
+    path = tmp_path / "http_cache.db"
+    monkeypatch.setattr(http_cache, "CACHE_PATH", path)
+    answers = [_response(b"<p>ok</p>", "text/html"), _response(b"", "text/html")]
+    answers[1].status_code = 304
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return answers[len(calls) - 1]
+
+    monkeypatch.setattr(http_cache.http_client, "get", fake_get)
+    http_cache.cached_get("https://example.rs/a")
+    with db_utils.db_session(path) as conn:  # let the entry expire
+        conn.execute("UPDATE http_cache SET fetched_at = fetched_at - ?", (http_cache.DEFAULT_TTL + 1,))
+
+    revalidated = http_cache.cached_get("https://example.rs/a")
+    again = http_cache.cached_get("https://example.rs/a")
+
+    assert revalidated.not_modified and revalidated.text == "<p>ok</p>"
+    assert again.from_cache and not again.not_modified
+    assert len(calls) == 2  # the third call is inside the renewed TTL
+
+
+def test_is_fresh_matches_cached_get(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_PATH", tmp_path / "http_cache.db")
+    monkeypatch.setattr(http_cache.http_client, "get", lambda url, **kwargs: _response(b"<p>ok</p>", "text/html"))
+
+    assert not http_cache.is_fresh("https://example.rs/a")
+    http_cache.cached_get("https://example.rs/a")
+    assert http_cache.is_fresh("https://example.rs/a")
+    assert not http_cache.is_fresh("https://example.rs/a", ttl=0)
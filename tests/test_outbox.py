@@ -0,0 +1,91 @@
+import requests
+
+from utils import outbox, poster
+from utils.db_utils import db_session
+
+
+def _entry(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.setattr(outbox, "OUTBOX_DIR", tmp_path / "outbox")
+    db_path = tmp_path / "articles.db"
+    base = dict(title="Rates held steady", content="Body", language="en")
+    siblings = [dict(title="Zinsen stabil", content="Text", language="de")]
+    return db_path, outbox.enqueue(base, siblings, topic="Economy", db_path=db_path, **kwargs)
+
+
+def test_retry_finds_post_created_by_interrupted_attempt(tmp_path, monkeypatch):
+    db_path, entry_id = _entry(tmp_path, monkeypatch)
+    server = {}  # idempotency key -> post, what WordPress actually holds
+    creates = []
+    lookups = []
+
+    def fake_group(base, siblings, *, already_posted=None, on_created=None, **kwargs):
+        for post in (base, *siblings):
+            code = post["language"]
+            if code in (already_posted or {}):
+                continue
+            assert "slug" not in post  # WordPress picks the public permalink
+            key = post["idempotency_key"]
+            creates.append(key)
+            server[key] = {"id": len(server) + 1, "link": f"https://wp.example.test/{code}"}
+            if len(creates) == 1:
+                raise requests.Timeout("created, but the response never arrived")
+            on_created(code, server[key])
+
+    def fake_find(keys, since=None, tally=None):
+        lookups.append(since)
+        return {key: server[key] for key in keys if key in server}
+
+    monkeypatch.setattr(poster, "publish_post_group", fake_group)
+    monkeypatch.setattr(poster, "find_posts_by_key", fake_find)
+
+    outbox._attempt(entry_id, db_path)          # EN created in WordPress, never recorded
+    posts = outbox._attempt(entry_id, db_path)  # retry must find it instead of posting again
+
+    assert len(creates) == 2 and len(set(creates)) == 2
+    assert set(posts) == {"en", "de"}
+    assert posts["en"]["id"] == server[creates[0]]["id"]
+    assert len(lookups) == 1 and lookups[0] is not None  # one lookup, bounded by the first attempt
+
+
+def test_failed_lookup_does_not_create(tmp_path, monkeypatch):
+    db_path, entry_id = _entry(tmp_path, monkeypatch)
+    with db_session(db_path) as conn:
+        conn.execute("UPDATE publish_outbox SET progress = '{\"started\": true}' WHERE id = ?", (entry_id,))
+
+    def lookup_down(*args, **kwargs):
+        raise requests.ConnectionError("down")
+
+    def must_not_create(*args, **kwargs):
+        raise AssertionError("created while earlier posts were unknown")
+
+    monkeypatch.setattr(poster, "find_posts_by_key", lookup_down)
+    monkeypatch.setattr(poster, "publish_post_group", must_not_create)
+    assert outbox._attempt(entry_id, db_path) == {}
+
+
+def test_reenqueue_does_not_copy_image_again(tmp_path, monkeypatch):
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"jpeg")
+    db_path, entry_id = _entry(tmp_path, monkeypatch, image_path=str(image))
+    copies = list((tmp_path / "outbox").iterdir())
+    assert len(copies) == 1
+
+    copies[0].unlink()  # as after publishing
+    _, again = _entry(tmp_path, monkeypatch, image_path=str(image))
+    assert again == entry_id
+    assert list((tmp_path / "outbox").iterdir()) == []
+
+
+def test_post_keys_are_per_language():
+    key = outbox.idempotency_key({"title": "Ölpreis steigt", "content": "x", "language": "de"})
+    assert outbox.post_key(key, "DE") == f"{key}:de"
+    assert outbox.post_key(key, None) == f"{key}:en"
+
+
+def test_key_goes_to_post_meta_not_slug():
+    payload = poster._build_payload(
+        "Title", "Body", status="publish", featured_image_id=None,
+        merged_terms={}, lang_code="de", translations=None, tally=None, idempotency_key="abc:de",
+    )
+    assert "slug" not in payload
+    assert payload["meta"] == {poster.IDEMPOTENCY_META_KEY: "abc:de"}
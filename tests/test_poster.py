@@ -0,0 +1,96 @@
+import requests
+
+from utils import poster
+
+
+def _sibling(code):
+    return dict(title=f"Title {code}", content=f"Body {code}", language=code)
+
+
+def test_batch_timeout_does_not_fall_back_to_single_posts(monkeypatch):
+    calls = []
+
+    def fake_wp(method, url, tally=None, **kwargs):
+        calls.append(url)
+        if tally is not None:
+            tally.add()
+        raise requests.Timeout("read timed out")
+
+    singles = []
+
+    def fake_post(**kwargs):
+        singles.append(kwargs.get("language"))
+        return {"id": 1, "link": "https://wp.example.test/en", "lang": "en"}
+
+    monkeypatch.setattr(poster, "_wp", fake_wp)
+    monkeypatch.setattr(poster, "post_to_wordpress", fake_post)
+    monkeypatch.setattr(poster, "_batch_available", lambda: True)
+    monkeypatch.setattr(poster, "_build_payload", lambda title, content, **kw: {"title": title, "lang": kw["lang_code"]})
+    monkeypatch.setattr(poster, "link_translations", lambda *a, **kw: None)
+
+    result = poster.publish_post_group(_sibling("en"), [_sibling("de"), _sibling("fr")])
+
+    # Only the base post went out singly; the batched siblings are left for the outbox
+    assert singles == ["en"]
+    assert result["posts"]["de"] is None and result["posts"]["fr"] is None
+    assert len(calls) == 1
+
+
+class _Resp:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+def test_batch_rejected_up_front_falls_back(monkeypatch):
+    monkeypatch.setattr(
+        poster, "_wp",
+        lambda *a, **kw: _Resp(404, {"code": "rest_no_route", "message": "No route"}),
+    )
+    assert poster._create_batch([{"lang": "de"}, {"lang": "fr"}], poster.RequestTally()) is None
+
+
+def test_batch_server_error_is_not_retried_singly(monkeypatch):
+    monkeypatch.setattr(poster, "_wp", lambda *a, **kw: _Resp(502, {}))
+    assert poster._create_batch([{"lang": "de"}, {"lang": "fr"}], poster.RequestTally()) == [None, None]
+
+
+def test_batch_probe_failure_is_not_remembered(monkeypatch):
+    answers = [requests.Timeout("slow"), _Resp(503, {}), _Resp(200, {"namespaces": ["wp/v2", "batch/v1"]})]
+
+    def fake_wp(*a, **kw):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(poster, "_wp", fake_wp)
+    monkeypatch.setattr(poster, "_batch_probe", None)
+
+    assert [poster._batch_available() for _ in range(4)] == [False, False, True, True]
+    assert answers == []  # the conclusive answer is cached
+
+
+def test_find_posts_by_key_pages_until_all_found(monkeypatch):
+    key = poster.IDEMPOTENCY_META_KEY
+    pages = {
+        1: [{"id": n, "meta": {key: f"other{n}"}} for n in range(poster.TERMS_PER_PAGE)],
+        2: [{"id": 500, "meta": {key: "k:de"}}, {"id": 501, "meta": {}}],
+    }
+    seen = []
+
+    def fake_wp(method, url, tally=None, params=None, **kwargs):
+        seen.append(params)
+        resp = _Resp(200, pages[params["page"]])
+        resp.raise_for_status = lambda: None
+        return resp
+
+    monkeypatch.setattr(poster, "_wp", fake_wp)
+    found = poster.find_posts_by_key({"k:de", "k:fr"}, since=1_700_000_000)
+
+    assert {k: p["id"] for k, p in found.items()} == {"k:de": 500}
+    assert [p["page"] for p in seen] == [1, 2]
+    assert seen[0]["modified_after"] == "2023-11-13T22:13:20"  # one day of slack
@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+from prompts import prompter
+
+
+def _item(n, quality, hours_old):
+    published = (prompter.pd.Timestamp.now("UTC") - prompter.pd.Timedelta(hours=hours_old)).strftime("%Y-%m-%d %H:%M:%S")
+    return dict(title=f"Story {n}", content="word " * 50, source="Wire", channel="RSS",
+                dt_published=published, score_quality=quality)
+
+
+def test_value_mode_fills_leftover_budget_with_zero_quality_items(monkeypatch):
+    fake = SimpleNamespace(
+        encode=lambda text: text.split(),
+        encode_ordinary_batch=lambda texts: [t.split() for t in texts],
+    )
+    monkeypatch.setattr(prompter, "_get_encoding", lambda: fake)
+    research = [_item(1, 5, 1), _item(2, 0, 2), _item(3, 0, 3)]
+
+    prompt = prompter.build_news_prompt(research, max_token_limit=10_000, mode="value")
+
+    # Plenty of budget: the zero-quality stories are kept too, as greedy mode would
+    assert all(f"Story {n}" in prompt for n in (1, 2, 3))
+    assert prompt.index("Story 1") < prompt.index("Story 2") < prompt.index("Story 3")
@@ -0,0 +1,28 @@
+from utils import editor
+
+
+def test_scrubbed_sentences_still_read_correctly():
+    text = (
+        "It is worth noting that the ministry acted within hours. "
+        "Looking ahead, prices may rise. The firm is looking ahead to 2026. "
+        "The deal is a testament to years of talks, and the minister has called for calm."
+    )
+    cleaned, removed = editor.scrub_boilerplate_report(text)
+
+    assert cleaned == (
+        "The ministry acted within hours. "
+        "Prices may rise. The firm is looking ahead to 2026. "
+        "The deal is a testament to years of talks, and the minister has called for calm."
+    )
+    assert removed == ["it is worth noting that", "looking ahead"]
+
+
+def test_mid_sentence_stock_phrases_are_flagged_not_deleted():
+    text = "The vote is a testament to resilience and plays a crucial role in the talks."
+    assert editor.scrub_boilerplate(text) == text
+    assert editor.flag_boilerplate(text) == ["a testament to", "plays a crucial role"]
+
+
+def test_lead_in_after_html_block_is_capitalized():
+    cleaned = editor.scrub_boilerplate("<p>Moving forward, the council will vote.</p>")
+    assert cleaned == "<p>The council will vote.</p>"
@@ -0,0 +1,65 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import translator
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(translator, "TM_PATH", tmp_path / "tm.db")
+    monkeypatch.setattr(translator, "count_tokens", lambda text: len(text.split()))
+    monkeypatch.setattr(translator, "_load_system_prompt", lambda kind: f"translate {kind}")
+
+
+def test_requests_in_flight_stay_under_the_global_cap(offline, monkeypatch):
+    cap = 3
+    monkeypatch.setattr(translator, "_in_flight", threading.BoundedSemaphore(cap))
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0, "calls": 0}
+
+    def fake_response(call_site, *, input, **kwargs):
+        with lock:
+            state["now"] += 1
+            state["calls"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.01)
+        with lock:
+            state["now"] -= 1
+        return SimpleNamespace(output_text=input[1]["content"].split("\n\n", 1)[1])
+
+    monkeypatch.setattr(translator.llm, "create_response", fake_response)
+    body = "\n\n".join(f"Paragraph {i} " + "word " * 200 for i in range(20))
+
+    results = translator.translate_post_contents(
+        "Title", body, ["German", "French", "Serbian"], max_workers=6
+    )
+
+    assert all(results)
+    assert state["calls"] > 3 * cap  # chunked: far more requests than the cap
+    assert state["peak"] <= cap
+
+
+def test_api_errors_are_not_retried_again(offline, monkeypatch):
+    calls = []
+
+    def failing(call_site, **kwargs):
+        calls.append(call_site)
+        raise ConnectionError("gateway gave up after its own retries")
+
+    monkeypatch.setattr(translator.llm, "create_response", failing)
+    with pytest.raises(RuntimeError):
+        translator.translate_text("One short paragraph.", "German")
+    assert len(calls) == 1
+
+
+def test_truncated_output_is_retried_once(offline, monkeypatch):
+    outputs = iter(["Kurz.", "Ein vollständig übersetzter Absatz. " * 10])
+    monkeypatch.setattr(
+        translator.llm, "create_response",
+        lambda call_site, **kwargs: SimpleNamespace(output_text=next(outputs)),
+    )
+    text = "A fully translated paragraph. " * 10
+    assert translator.translate_text(text, "German").startswith("Ein vollständig")
@@ -1,11 +1,14 @@
 from utils.logger import logger
 from datetime import datetime, timedelta
+from contextlib import contextmanager
+import atexit
 import sqlite3
+import threading
 import os
 import email.utils
 from pathlib import Path
 import pandas as pd
-from typing import Optional
+from typing import Callable, Iterator, Optional, Sequence
 
 # --- Paths ---
 BASE_DIR: Path = Path(__file__).resolve().parent.parent  # project root
@@ -63,48 +66,288 @@ def backup_sqlite(src: Path, dst: Path) -> None:
     with sqlite3.connect(src) as source, sqlite3.connect(dst) as target:
         source.backup(target)  # atomic, consistent copy
 
+# --- Connection manager ---
+# One long-lived connection per DB file per process. sqlite3 connections are
+# not safe to use from several threads at once, so every use goes through
+# db_session(), which holds a process-wide lock for the duration.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",       # readers never block the writer
+    "PRAGMA synchronous = NORMAL",     # safe with WAL, far fewer fsyncs
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -20000",      # ~20 MB page cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped reads
+    "PRAGMA busy_timeout = 10000",
+)
+
+_connections: dict[str, sqlite3.Connection] = {}
+_connections_pid: Optional[int] = None
+_connections_lock = threading.RLock()
+
+
+def _migration_1(conn: sqlite3.Connection) -> None:
+    """Base tables plus indexes for the link/title duplicate checks."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            content TEXT,
+            channel TEXT,
+            source TEXT,
+            topic TEXT,
+            link TEXT,
+            dt_published TEXT,
+            dt_added TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS posted_articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            content TEXT,
+            topic TEXT,
+            category TEXT,
+            summary TEXT,
+            link TEXT UNIQUE,
+            dt_published TEXT
+        )
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posted_articles_category "
+        "ON posted_articles(category, dt_published)"
+    )
+    for column in ("link", "title"):
+        try:
+            conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_{column} ON articles({column})"
+            )
+        except sqlite3.IntegrityError:
+            # Legacy rows with duplicates: still index for O(log n) lookups.
+            logger.warning(
+                f"[db_utils] - Duplicate articles.{column} values found; "
+                f"creating a non-unique index instead."
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_articles_{column} ON articles({column})"
+            )
+
+
+def _migration_2(conn: sqlite3.Connection) -> None:
+    """Outbox of finished articles waiting to be published to WordPress."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS publish_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT UNIQUE,
+            topic TEXT,
+            payload TEXT,
+            progress TEXT,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at REAL,
+            dt_created TEXT,
+            dt_updated TEXT
+        )
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_publish_outbox_status "
+        "ON publish_outbox(status, next_attempt_at)"
+    )
+
+
+def _migration_3(conn: sqlite3.Connection) -> None:
+    """Per-stage checkpoints of the daily topic pipeline."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pipeline_stages (
+            run_date TEXT,
+            topic TEXT,
+            stage TEXT,
+            output TEXT,
+            duration REAL,
+            dt_finished TEXT,
+            PRIMARY KEY (run_date, topic, stage)
+        )
+    ''')
+
+
+# Ordered schema migrations; PRAGMA user_version records how many have run.
+# Other databases (the caches under assets/) pass their own tuple to
+# get_connection()/db_session(); each file keeps its own user_version.
+MIGRATIONS = (
+    _migration_1,
+    _migration_2,
+    _migration_3,
+)
+
+
+def _migrate(conn: sqlite3.Connection, migrations: Sequence[Callable], name: str) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(migrations[version:], start=version + 1):
+        with conn:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+        logger.info(f"[db_utils] - Applied {name} migration {number}: {migration.__doc__}")
+
+
+def get_connection(db_path=DB_PATH, migrations: Sequence[Callable] = MIGRATIONS) -> sqlite3.Connection:
+    """
+    Return this process's shared connection to `db_path`, opening it (with
+    WAL + pragmas, and running pending `migrations`) on first use.
+    Use db_session() rather than calling this from worker threads.
+    """
+    global _connections_pid
+    key = str(db_path)
+    with _connections_lock:
+        if _connections_pid != os.getpid():
+            # Forked child: never reuse the parent's handles
+            _connections.clear()
+            _connections_pid = os.getpid()
+
+        conn = _connections.get(key)
+        if conn is None:
+            Path(key).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(key, timeout=10, check_same_thread=False)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            _migrate(conn, migrations, Path(key).name)
+            _connections[key] = conn
+        return conn
+
+
+@contextmanager
+def db_session(db_path=DB_PATH, migrations: Sequence[Callable] = MIGRATIONS) -> Iterator[sqlite3.Connection]:
+    """
+    Hold the shared connection exclusively for one transaction.
+    Commits on success, rolls back on error.
+    """
+    with _connections_lock:
+        conn = get_connection(db_path, migrations)
+        with conn:
+            yield conn
+
+
+@atexit.register
+def close_connections() -> None:
+    """Close every shared connection (checkpoints the WAL)."""
+    with _connections_lock:
+        for conn in _connections.values():
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _connections.clear()
+
+
 # --- Core Functions ---
 
-def insert_article(article, db_path=DB_PATH):
+def _existing_values(cursor, column, values):
+    """Subset of `values` already present in articles.<column> (chunked IN query)."""
+    values = [v for v in dict.fromkeys(values) if v is not None]
+    found = set()
+    for start in range(0, len(values), 500):
+        chunk = values[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(
+            f"SELECT {column} FROM articles WHERE {column} IN ({placeholders})", chunk
+        )
+        found.update(row[0] for row in cursor.fetchall())
+    return found
+
+
+def insert_articles(batch, db_path=DB_PATH):
     """
-    Insert a scraped article into the articles table.
+    Insert a batch of scraped articles in a single transaction.
+
+    Returns one status per input item, in order:
+      200 = inserted, 400 = duplicate (by link or title, in the DB or
+      earlier in the same batch), 500 = database error.
     """
+    batch = list(batch)
+    if not batch:
+        return []
+
     try:
-        with sqlite3.connect(db_path, timeout=10) as conn:
+        with db_session(db_path) as conn:
             cursor = conn.cursor()
 
-            # Check if article already exists by link or title
-            cursor.execute("""
-                SELECT 1 FROM articles
-                WHERE link = ? OR title = ?
-            """, (article.get("link"), article.get("title")))
-            exists = cursor.fetchone()
+            # Duplicate check by link or title (both indexed), one query each
+            seen_links = _existing_values(cursor, "link", [a.get("link") for a in batch])
+            seen_titles = _existing_values(cursor, "title", [a.get("title") for a in batch])
 
-            if exists:
-                return 400  # Already exists
+            statuses, rows = [], []
+            dt_added = datetime.utcnow().isoformat()
+            for article in batch:
+                link, title = article.get("link"), article.get("title")
+                if link in seen_links or title in seen_titles:
+                    statuses.append(400)  # Already exists
+                    continue
+                if link is not None:
+                    seen_links.add(link)
+                if title is not None:
+                    seen_titles.add(title)
+                statuses.append(200)
+                rows.append((
+                    title,
+                    article.get("content"),
+                    article.get("channel"),
+                    article.get("source"),
+                    article.get("topic"),
+                    link,
+                    article.get("dt_published"),
+                    dt_added,
+                ))
 
-            # Insert new article
-            query = '''
-            INSERT OR IGNORE INTO articles (
+            cursor.executemany('''
+            INSERT INTO articles (
                 title, content, channel, source, topic, link, dt_published, dt_added
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
-            '''
-            cursor.execute(query, (
-                article.get("title"),
-                article.get("content"),
-                article.get("channel"),
-                article.get("source"),
-                article.get("topic"),
-                article.get("link"),
-                article.get("dt_published"),
-                datetime.utcnow().isoformat()
-            ))
-            conn.commit()
-            return 200
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT DO NOTHING;
+            ''', rows)
+            return statuses
 
     except sqlite3.OperationalError as e:
         logger.info(f"[db_utils] - Database insert error: {e}")
-        return 500
+        return [500] * len(batch)
+
+
+def insert_article(article, db_path=DB_PATH):
+    """
+    Insert a scraped article into the articles table.
+    """
+    return insert_articles([article], db_path=db_path)[0]
+
+
+def find_known_articles(links, db_path=DB_PATH):
+    """
+    Bulk lookup of already-ingested articles by link.
+
+    Returns a dict {link: article_row} for every link present in the
+    articles table, so scrapers can skip downloading them.
+    """
+    links = [l for l in dict.fromkeys(links) if l]
+    if not links:
+        return {}
+
+    known = {}
+    try:
+        with db_session(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(links), 500):
+                chunk = links[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = cursor.execute(f"""
+                    SELECT title, content, channel, source, topic, link, dt_published
+                    FROM articles
+                    WHERE link IN ({placeholders})
+                """, chunk).fetchall()
+                for row in rows:
+                    known[row["link"]] = dict(row)
+    except sqlite3.OperationalError as e:
+        logger.info(f"[db_utils] - Known-article lookup failed: {e}")
+        return {}
+
+    return known
 
 
 def to_sql_datetime(raw_date):
@@ -136,7 +379,7 @@ def fetch_posts(category, limit=100, db_path=DB_PATH):
     """
     Fetch the most recent posts in a category as a list of dicts.
     """
-    with sqlite3.connect(db_path) as conn:
+    with db_session(db_path) as conn:
         df = pd.read_sql_query(f"""
             SELECT *
             FROM posted_articles
@@ -159,23 +402,10 @@ def save_generated_article(
         dt_published = datetime.utcnow().isoformat()
 
     try:
-        with sqlite3.connect(db_path, timeout=10) as conn:
+        # posted_articles is created by the schema migrations in get_connection()
+        with db_session(db_path) as conn:
             cursor = conn.cursor()
 
-            # Create table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS posted_articles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT,
-                    content TEXT,
-                    topic TEXT,
-                    category TEXT,
-                    summary TEXT,
-                    link TEXT UNIQUE,
-                    dt_published TEXT
-                )
-            ''')
-
             # Insert the record
             cursor.execute("""
                 INSERT INTO posted_articles (
@@ -191,8 +421,7 @@ def save_generated_article(
                 dt_published
             ))
 
-            conn.commit()
-            logger.info("Generated article saved to database.")
+        logger.info("Generated article saved to database.")
 
     except sqlite3.IntegrityError:
         logger.warning(f"Article with link '{link}' already exists.")
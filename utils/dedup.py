@@ -0,0 +1,122 @@
+import re
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+from prompts.prompter import count_tokens
+from utils.logger import logger
+
+# === MinHash / LSH settings ===
+SHINGLE_SIZE = 5          # words per shingle
+NUM_PERM = 128            # signature length
+BANDS = 16                # LSH bands (NUM_PERM / BANDS rows each)
+SIMILARITY = 0.6          # estimated Jaccard needed to call two items the same story
+_PRIME = np.uint64(4294967311)  # smallest prime > 2**32
+
+_rng = np.random.default_rng(20240501)  # fixed seed: signatures are stable across runs
+_PERM_A = _rng.integers(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _shingles(text: str) -> np.ndarray:
+    """32-bit hashes of the overlapping word k-grams of `text`."""
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64))
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values); all-max for empty text."""
+    shingles = _shingles(text)
+    if shingles.size == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    hashed = (_PERM_A[:, None] * shingles[None, :] + _PERM_B[:, None]) % _PRIME
+    return hashed.min(axis=1)
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_near_duplicates(texts: List[str], similarity: float = SIMILARITY) -> List[int]:
+    """
+    Group near-duplicate texts. Returns a cluster id per input (the index
+    of one member), using MinHash + LSH banding to find candidate pairs and
+    the signature agreement rate to confirm them.
+    """
+    n = len(texts)
+    parent = list(range(n))
+    if n < 2:
+        return parent
+
+    signatures = np.vstack([minhash_signature(t) for t in texts])
+    has_text = np.array([bool(_WORD_RE.search(t or "")) for t in texts])
+    rows = NUM_PERM // BANDS
+
+    for band in range(BANDS):
+        buckets: Dict[bytes, List[int]] = {}
+        chunk = signatures[:, band * rows:(band + 1) * rows]
+        for i in np.flatnonzero(has_text):
+            buckets.setdefault(chunk[i].tobytes(), []).append(int(i))
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_a, root_b = _find(parent, first), _find(parent, other)
+                if root_a == root_b:
+                    continue
+                if np.mean(signatures[first] == signatures[other]) >= similarity:
+                    parent[root_b] = root_a
+
+    return [_find(parent, i) for i in range(n)]
+
+
+def _quality(item: dict) -> float:
+    try:
+        value = float(item.get("score_quality"))
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value  # NaN from empty Excel cells
+
+
+def dedupe_research(research_list: List[dict], similarity: float = SIMILARITY) -> List[dict]:
+    """
+    Collapse copies of the same story (SERP, RSS, Telegram...) into one item.
+
+    The representative is the copy from the best-rated source (longest text
+    on ties). It gets a `sources` list naming every outlet that carried the
+    story, which build_news_prompt shows instead of the single source.
+    """
+    if not research_list:
+        return []
+
+    clusters: Dict[int, List[int]] = {}
+    for idx, root in enumerate(cluster_near_duplicates([i.get("content") or "" for i in research_list], similarity)):
+        clusters.setdefault(root, []).append(idx)
+
+    kept, tokens_saved = [], 0
+    for members in clusters.values():
+        items = [research_list[i] for i in members]
+        best = max(items, key=lambda i: (_quality(i), len(i.get("content") or "")))
+        representative = dict(best)
+        representative["sources"] = list(dict.fromkeys(
+            "{} ({})".format(i.get("source"), i.get("channel")) for i in items
+        ))
+        kept.append(representative)
+        tokens_saved += sum(count_tokens(i.get("content") or "") for i in items if i is not best)
+
+    logger.info(
+        f"Dedup: {len(research_list)} items → {len(kept)} stories, "
+        f"~{tokens_saved} content tokens saved"
+    )
+    return kept
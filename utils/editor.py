@@ -1,24 +1,74 @@
+import csv
 import os
 from pathlib import Path
 import re
-from typing import Optional
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from openai import OpenAI
+from utils import llm, scrubber
 from utils.logger import logger
+from prompts.prompter import count_tokens
 
 # =========================
-# Environment & OpenAI init
+# Environment
 # =========================
 
 base_dir = Path(__file__).resolve().parent.parent  # project root
 dotenv_path = os.path.join(base_dir, ".env")
 load_dotenv(dotenv_path)
 
-openai_key = os.getenv("OPENAI_API_KEY")
-if not openai_key:
-    logger.error("OPENAI_API_KEY is not set in the environment.")
-client = OpenAI(api_key=openai_key)
+# Local pre-grader: the LLM grader is skipped when the local score is more than
+# PREGRADE_MARGIN above the refine threshold (one-sided: a low local score is
+# always confirmed by the LLM). refine_article still LLM-grades the first draft
+# of every article. PREGRADE_CALIBRATE=1 asks it every time so the calibration
+# file gets unbiased pairs.
+PREGRADE_MARGIN = int(os.getenv("PREGRADE_MARGIN", "15"))
+PREGRADE_CALIBRATE = os.getenv("PREGRADE_CALIBRATE", "0") == "1"
+CALIBRATION_PATH = base_dir / "assets" / "grade_calibration.csv"
 
+# Speculative editing: rewrite candidates per round (1 = serial loop) and an
+# optional cap on tokens spent per article (0 = no cap)
+EDITOR_CANDIDATES = int(os.getenv("EDITOR_CANDIDATES", "1"))
+EDITOR_MAX_TOKENS = int(os.getenv("EDITOR_MAX_TOKENS", "0"))
+PROMPT_OVERHEAD_TOKENS = 600  # system prompts and grader output per rewrite + grade
+
+
+class TokenBudget:
+    """Thread-safe tally of tokens spent on one article, with an optional cap."""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit or None
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def charge(self, response) -> None:
+        if llm.served_from_cache(response):
+            return  # replayed from the completion cache: nothing was spent
+        usage = getattr(response, "usage", None)
+        tokens = getattr(usage, "total_tokens", None) or 0
+        with self._lock:
+            self.used += tokens
+
+    @property
+    def exhausted(self) -> bool:
+        return self.limit is not None and self.used >= self.limit
+
+    def affordable(self, wanted: int, cost: int) -> int:
+        """How many of `wanted` calls of about `cost` tokens each still fit under the cap."""
+        if self.limit is None:
+            return wanted
+        with self._lock:
+            remaining = max(0, self.limit - self.used)
+        return max(0, min(wanted, remaining // max(1, cost)))
+
+
+def _round_cost(article_text: str) -> int:
+    """Estimated tokens for one rewrite (article in + out) plus one LLM grade (article in)."""
+    return 3 * count_tokens(article_text) + PROMPT_OVERHEAD_TOKENS
 
 
 # ====================================
@@ -34,11 +84,14 @@ CLICHE_PATTERNS = (
     r"\bhas called for\b",
 )
 
-def scrub_boilerplate(text: str) -> str:
-    """Remove common boilerplate/clichés and tidy whitespace."""
-    cleaned = text
-    for pat in CLICHE_PATTERNS:
-        cleaned = re.sub(pat, "", cleaned, flags=re.IGNORECASE)
+def scrub_boilerplate_report(text: str, language: str = "en") -> Tuple[str, List[str]]:
+    """
+    Remove the sentence-opening lead-ins in prompts/banned_phrases/<language>.txt
+    in a single regex pass, then tidy whitespace. Phrases that would leave a
+    broken sentence are only flagged (see flag_boilerplate()).
+    Returns (cleaned text, removed phrases).
+    """
+    cleaned, matches = scrubber.get_matcher(language).scrub(text)
     # Tighten stacked hedges like "however, nevertheless"
     cleaned = re.sub(
         r"\b(however|nevertheless|nonetheless)\s*,\s*(however|nevertheless|nonetheless)\b",
@@ -49,13 +102,31 @@ def scrub_boilerplate(text: str) -> str:
     # Normalize spaces
     cleaned = re.sub(r"[ \t]{2,}", " ", cleaned)
     cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-    return cleaned.strip()
+    return cleaned.strip(), matches
+
+
+def scrub_boilerplate(text: str, language: str = "en") -> str:
+    """Remove common boilerplate/clichés and tidy whitespace."""
+    return scrub_boilerplate_report(text, language)[0]
+
+
+def flag_boilerplate(text: str, language: str = "en") -> List[str]:
+    """Stock phrases (CLICHE_PATTERNS and <language>.flag.txt) to rephrase rather than delete."""
+    return scrubber.get_matcher(language, CLICHE_PATTERNS, flags=True).find(text)
+
+
+def _rephrase_note(text: str) -> str:
+    """Extra instruction naming the flagged stock phrases in `text` ('' if none)."""
+    flagged = sorted(set(flag_boilerplate(text)))
+    if not flagged:
+        return ""
+    return "Rephrase these stock phrases with concrete wording: " + "; ".join(flagged) + ".\n\n"
 
 
 # ===============================================
 # 0.5) One-time: de-template the lede (first sent)
 # ===============================================
-def detemplate_lede_once(text: str) -> str:
+def detemplate_lede_once(text: str, budget: Optional[TokenBudget] = None) -> str:
     """
     Rewrite ONLY the first sentence to remove generic framing and clichés.
     Keep facts and length; return the full paragraph text.
@@ -69,19 +140,22 @@ def detemplate_lede_once(text: str) -> str:
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": text.strip()},
     ]
-    resp = client.chat.completions.create(
+    resp = llm.chat_completion(
+        "editor.lede",
         model="gpt-4o-mini",
         messages=messages,
         temperature=0.4,
         max_tokens=600,
     )
+    if budget:
+        budget.charge(resp)
     return resp.choices[0].message.content.strip()
 
 # =========================================
 # 1) Unbiased rubric-based grader (no anchor)
 # =========================================
 
-def grade_base(article_text: str) -> int:
+def grade_base(article_text: str, budget: Optional[TokenBudget] = None) -> int:
     """
     Fresh score (1–100) for AI-likeness using a weighted rubric.
     Deterministic: no anchoring; normalized for news conventions.
@@ -111,13 +185,17 @@ def grade_base(article_text: str) -> int:
         },
     ]
 
-    response = client.chat.completions.create(
+    response = llm.chat_completion(
+        "editor.grade",
         model="gpt-4o-mini",
         messages=messages,
         temperature=0,
         top_p=0,
         max_tokens=5,
+        cache=True,  # deterministic: re-grading an unchanged draft is free
     )
+    if budget:
+        budget.charge(response)
 
     content = response.choices[0].message.content.strip()
     try:
@@ -127,6 +205,127 @@ def grade_base(article_text: str) -> int:
         raise ValueError(f"Unexpected grading output: {content}")
 
 
+# ==============================================
+# 1.5) Local AI-likeness pre-grader (CPU only)
+# ==============================================
+_SENTENCE_RE = re.compile(r"[^.!?]+[.!?]+|[^.!?]+$")
+_WORD_RE = re.compile(r"[A-Za-z']+")
+HEDGES = frozenset((
+    "however", "moreover", "furthermore", "additionally", "nevertheless", "nonetheless",
+    "notably", "significant", "significantly", "potentially", "potential", "likely",
+    "may", "might", "could", "perhaps", "arguably", "overall", "crucial", "underscores",
+    "amid", "various", "ongoing", "broader", "landscape", "highlighting",
+))
+
+# feature -> (human-like value, AI-like value, weight); scores are interpolated between the two
+FEATURE_ANCHORS: Dict[str, Tuple[float, float, float]] = {
+    "cliche_per_1k": (0.0, 3.0, 0.25),      # banned phrase / CLICHE_PATTERNS hits per 1,000 words
+    "sentence_cv": (0.60, 0.25, 0.20),      # stdev/mean of sentence lengths (monotony)
+    "type_token": (0.80, 0.62, 0.15),       # moving-window type-token ratio (50 words)
+    "hedge_per_100": (0.5, 3.0, 0.25),      # hedge/transition words per 100 words
+    "repeated_trigrams": (0.01, 0.08, 0.15),  # share of word trigrams seen more than once
+}
+
+
+def local_features(text: str) -> Dict[str, float]:
+    """Stylometric features used by local_ai_score()."""
+    words = [w.lower() for w in _WORD_RE.findall(text)]
+    n = len(words)
+    if n == 0:
+        return {name: anchors[0] for name, anchors in FEATURE_ANCHORS.items()}
+
+    lengths = [len(_WORD_RE.findall(s)) for s in _SENTENCE_RE.findall(text)]
+    lengths = [length for length in lengths if length]
+    mean = statistics.fmean(lengths) if lengths else 0.0
+    cv = statistics.pstdev(lengths) / mean if len(lengths) > 1 and mean else FEATURE_ANCHORS["sentence_cv"][0]
+
+    window = 50
+    if n <= window:
+        ttr = len(set(words)) / n
+    else:
+        counts = Counter(words[:window])
+        total = len(counts)
+        for i in range(window, n):
+            counts[words[i]] += 1
+            old = words[i - window]
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+            total += len(counts)
+        ttr = total / (n - window + 1) / window
+
+    trigrams = Counter(zip(words, words[1:], words[2:]))
+    repeated = sum(c for c in trigrams.values() if c > 1) / max(1, n - 2)
+
+    return {
+        "cliche_per_1k": (len(scrubber.get_matcher("en").find(text)) + len(flag_boilerplate(text))) * 1000 / n,
+        "sentence_cv": cv,
+        "type_token": ttr,
+        "hedge_per_100": sum(w in HEDGES for w in words) * 100 / n,
+        "repeated_trigrams": repeated,
+    }
+
+
+def local_ai_score(text: str, features: Optional[Dict[str, float]] = None) -> int:
+    """
+    Heuristic AI-likeness score (1–100, higher = more AI-like) on the same
+    scale as grade_base(). Runs in milliseconds; see
+    benchmarks/bench_pregrader.py for calibration against LLM grades.
+    """
+    features = features or local_features(text)
+    weighted = 0.0
+    for name, (human, ai, weight) in FEATURE_ANCHORS.items():
+        position = (features[name] - human) / (ai - human)
+        weighted += weight * max(0.0, min(1.0, position))
+    return max(1, min(100, int(round(1 + 98 * weighted))))
+
+
+def _record_calibration(local: int, llm_score: int, features: Dict[str, float]) -> None:
+    """Append a (local, LLM) grade pair to assets/grade_calibration.csv."""
+    fields = ["timestamp", "local_score", "llm_score", *FEATURE_ANCHORS]
+    try:
+        CALIBRATION_PATH.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not CALIBRATION_PATH.exists()
+        with open(CALIBRATION_PATH, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            if new_file:
+                writer.writeheader()
+            writer.writerow({
+                "timestamp": int(time.time()),
+                "local_score": local,
+                "llm_score": llm_score,
+                **{name: round(value, 4) for name, value in features.items()},
+            })
+    except OSError as e:
+        logger.warning(f"Could not record grade calibration pair: {e}")
+
+
+def grade_article(
+    article_text: str,
+    threshold: int,
+    margin: int = PREGRADE_MARGIN,
+    budget: Optional[TokenBudget] = None,
+    require_llm: bool = False,
+) -> Tuple[int, Optional[int]]:
+    """
+    Score an article locally and, unless the local score is clearly worse than
+    `threshold` (above threshold + margin) and `require_llm` is False, with
+    the LLM grader as well. The two scores are on different scales and are
+    never mixed: only an LLM grade can accept a draft.
+    Returns (local score, LLM score or None).
+    """
+    features = local_features(article_text)
+    local = local_ai_score(article_text, features)
+    if not (PREGRADE_CALIBRATE or require_llm) and local > threshold + margin:
+        logger.info(f"Local pre-grade {local} is above {threshold}+{margin}; skipping LLM grader")
+        return local, None
+
+    base = grade_base(article_text, budget)
+    logger.info(f"Local pre-grade {local} | LLM grade {base}")
+    _record_calibration(local, base, features)
+    return local, base
+
+
 # ===========================================
 # 2) Score smoother (less sticky, but stable)
 # ===========================================
@@ -162,14 +361,8 @@ def smooth_score(
 # ==================================
 # 3) Rewriter aligned to the rubric
 # ==================================
-def humanize_article(article_text: str, score: Optional[int] = None, mode: str = "gentle") -> str:
-    """
-    Refine the article to read as if written by a human journalist.
-
-    mode:
-      - "gentle": small, precise edits (default)
-      - "aggressive": stronger de-templating when stuck
-    """
+def _humanize_style(mode: str) -> Tuple[str, dict]:
+    """System prompt and sampling parameters for a rewrite mode ("gentle" / "aggressive")."""
     # Shared base instructions
     core_prompt = (
         "You are a professional human news editor. "
@@ -187,30 +380,44 @@ def humanize_article(article_text: str, score: Optional[int] = None, mode: str =
             "Make subtle, precise edits only where needed. Preserve tone and paragraph structure. "
             "Avoid sweeping rewrites."
         )
-        temperature = 0.6
-        presence_penalty = 0.25
-        frequency_penalty = 0.3
+        sampling = {"temperature": 0.6, "presence_penalty": 0.25, "frequency_penalty": 0.3}
     else:  # aggressive
         style_tail = (
             "Apply stronger de-templating: rewrite generic openings, replace vague transitions with concrete ones "
             "(without adding facts), break up monotonous long sentences, and reduce stock phrasing aggressively. "
             "Keep all factual content intact and do not shorten overall length."
         )
-        temperature = 0.75
-        presence_penalty = 0.4
-        frequency_penalty = 0.45
+        sampling = {"temperature": 0.75, "presence_penalty": 0.4, "frequency_penalty": 0.45}
+
+    return f"{core_prompt} {style_tail}", sampling
 
-    system_prompt = f"{core_prompt} {style_tail}"
+
+def humanize_article(
+    article_text: str,
+    score: Optional[int] = None,
+    mode: str = "gentle",
+    budget: Optional[TokenBudget] = None,
+) -> str:
+    """
+    Refine the article to read as if written by a human journalist.
+
+    mode:
+      - "gentle": small, precise edits (default)
+      - "aggressive": stronger de-templating when stuck
+    """
+    system_prompt, sampling = _humanize_style(mode)
 
     if score is not None:
         user_message = (
             f"Current AI-likeness score: {score}. "
             "Edit to reduce AI-like tone per the targets above, keeping meaning intact.\n\n"
+            f"{_rephrase_note(article_text)}"
             f"Article text:\n{article_text.strip()}"
         )
     else:
         user_message = (
             "Edit to reduce AI-like tone per the targets above, keeping meaning intact.\n\n"
+            f"{_rephrase_note(article_text)}"
             f"Article text:\n{article_text.strip()}"
         )
 
@@ -219,16 +426,169 @@ def humanize_article(article_text: str, score: Optional[int] = None, mode: str =
         {"role": "user", "content": user_message},
     ]
 
-    response = client.chat.completions.create(
+    response = llm.chat_completion(
+        f"editor.humanize.{mode}",
         model="gpt-4o",
         messages=messages,
-        temperature=temperature,
-        presence_penalty=presence_penalty,
-        frequency_penalty=frequency_penalty,
+        **sampling,
     )
+    if budget:
+        budget.charge(response)
     return response.choices[0].message.content.strip()
 
 
+# ==========================================
+# 3.5) Paragraph-targeted rewriting
+# ==========================================
+_PARAGRAPH_BREAK = re.compile(r"(\n[ \t]*\n\s*)")
+MIN_PARAGRAPH_WORDS = 25  # shorter blocks (headings, one-liners) are never rewritten on their own
+
+
+def humanize_paragraph(
+    paragraph: str,
+    previous: str = "",
+    mode: str = "gentle",
+    budget: Optional[TokenBudget] = None,
+) -> str:
+    """
+    Rewrite one paragraph with the same targets as humanize_article().
+    The previous paragraph is sent as read-only context so transitions still fit.
+    """
+    system_prompt, sampling = _humanize_style(mode)
+    system_prompt += (
+        " You are given ONE paragraph of a longer article. "
+        "Return only the revised paragraph: no preamble, no quotes, no extra paragraphs."
+    )
+    context = f"Previous paragraph (context only, do not edit):\n{previous.strip()}\n\n" if previous else ""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"{context}{_rephrase_note(paragraph)}Paragraph to edit:\n{paragraph.strip()}"},
+    ]
+
+    response = llm.chat_completion(
+        f"editor.humanize.paragraph.{mode}",
+        model="gpt-4o",
+        messages=messages,
+        **sampling,
+    )
+    if budget:
+        budget.charge(response)
+    return response.choices[0].message.content.strip()
+
+
+def humanize_paragraphs(
+    article_text: str,
+    k: int = 2,
+    mode: str = "gentle",
+    max_workers: int = 4,
+    budget: Optional[TokenBudget] = None,
+) -> str:
+    """
+    Score paragraphs with local_ai_score(), rewrite the `k` worst ones
+    concurrently and splice them back; other paragraphs are left untouched.
+    A paragraph whose rewrite fails keeps its original text.
+    """
+    parts = _PARAGRAPH_BREAK.split(article_text.strip())
+    paragraphs, separators = parts[0::2], parts[1::2]
+
+    scored = [
+        (local_ai_score(p), i)
+        for i, p in enumerate(paragraphs)
+        if len(p.split()) >= MIN_PARAGRAPH_WORDS
+    ]
+    worst = [i for _, i in sorted(scored, reverse=True)[:k]]
+    if not worst:
+        logger.info("No paragraph long enough to target; rewriting the whole article instead.")
+        return humanize_article(article_text, mode=mode, budget=budget)
+
+    logger.info(f"Rewriting paragraphs {[i + 1 for i in worst]} of {len(paragraphs)} (most AI-like locally)")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(worst))), thread_name_prefix="para") as pool:
+        futures = {
+            i: pool.submit(humanize_paragraph, paragraphs[i], paragraphs[i - 1] if i else "", mode, budget)
+            for i in worst
+        }
+
+    for i, future in futures.items():
+        try:
+            rewritten = future.result()
+        except Exception as exc:
+            logger.warning(f"Paragraph {i + 1} rewrite failed, keeping original: {exc}")
+            continue
+        if rewritten:
+            paragraphs[i] = rewritten
+
+    out = paragraphs[0]
+    for separator, paragraph in zip(separators, paragraphs[1:]):
+        out += separator + paragraph
+    return out
+
+
+# ==========================================
+# 3.75) Speculative candidates
+# ==========================================
+def _rewrite(
+    article_text: str,
+    score: Optional[int],
+    mode: str,
+    rewrite_scope: str,
+    paragraphs_per_pass: int,
+    budget: Optional[TokenBudget],
+) -> str:
+    """One rewrite pass; gentle passes honour rewrite_scope, aggressive ones rewrite the whole article."""
+    if mode == "gentle" and rewrite_scope == "paragraphs":
+        return humanize_paragraphs(article_text, k=paragraphs_per_pass, mode=mode, budget=budget)
+    return humanize_article(article_text, score=score, mode=mode, budget=budget)
+
+
+def best_candidate(
+    article_text: str,
+    score: Optional[int],
+    n: int,
+    threshold: int,
+    *,
+    pregrade_margin: int = PREGRADE_MARGIN,
+    rewrite_scope: str = "article",
+    paragraphs_per_pass: int = 2,
+    budget: Optional[TokenBudget] = None,
+) -> Optional[Tuple[str, Tuple[int, Optional[int]], int]]:
+    """
+    Generate `n` rewrites concurrently (alternating gentle / aggressive),
+    grade them concurrently and return (text, (local, LLM score or None),
+    LLM grades used) for the best one, or None if every rewrite failed.
+    """
+    modes = ["gentle" if i % 2 == 0 else "aggressive" for i in range(n)]
+    with ThreadPoolExecutor(max_workers=n, thread_name_prefix="candidate") as pool:
+        futures = [
+            pool.submit(_rewrite, article_text, score, mode, rewrite_scope, paragraphs_per_pass, budget)
+            for mode in modes
+        ]
+        candidates = []
+        for mode, future in zip(modes, futures):
+            try:
+                candidates.append((mode, future.result()))
+            except Exception as exc:
+                logger.warning(f"{mode.capitalize()} candidate failed: {exc}")
+        if not candidates:
+            return None
+
+        grades = list(pool.map(
+            lambda c: grade_article(c[1], threshold, margin=pregrade_margin, budget=budget),
+            candidates,
+        ))
+
+    # LLM-graded candidates first (by LLM grade), then the rest by local score
+    ranked = sorted(
+        zip(grades, candidates),
+        key=lambda g: (g[0][1] is None, g[0][1] if g[0][1] is not None else g[0][0]),
+    )
+    logger.info("Candidate scores: " + ", ".join(
+        f"{mode} {'LLM ' + str(base) if base is not None else 'local ' + str(local)}"
+        for (local, base), (mode, _) in ranked
+    ))
+    grade, (_, text) = ranked[0]
+    return text, grade, sum(base is not None for _, base in grades)
+
+
 # ====================
 # 4) Main refinement
 # ====================
@@ -238,79 +598,170 @@ def refine_article(
     limit: int = 5,
     threshold: int = 20,
     require_base_improvement: int = 2,   # was 3
-    no_gain_patience: int = 3            # was 2
+    no_gain_patience: int = 3,           # was 2
+    pregrade_margin: int = PREGRADE_MARGIN,
+    rewrite_scope: str = "article",      # "article" | "paragraphs"
+    paragraphs_per_pass: int = 2,
+    candidates: int = EDITOR_CANDIDATES,
+    max_tokens_per_article: int = EDITOR_MAX_TOKENS,
 ) -> str:
     """
     Iteratively rewrite an article until it sounds less AI-like.
     Returns the best (lowest-smoothed-score) version if threshold not reached.
+    Each draft is scored locally first; the LLM grader is skipped only when
+    the local score is above `threshold` + `pregrade_margin`, and never for
+    the first draft, so every call gets at least one real grade. Only an LLM
+    grade can accept a draft or set the best-so-far version.
+
+    rewrite_scope="paragraphs" makes the gentle passes rewrite only the
+    `paragraphs_per_pass` most AI-like paragraphs (concurrently); the
+    stagnation pass still rewrites the whole article aggressively.
+
+    candidates > 1 generates that many rewrites per round (gentle and
+    aggressive at once), grades them concurrently and keeps the best.
+    max_tokens_per_article (0 = no cap) stops the loop with the best-so-far
+    version once the tokens left cannot pay for another round (estimated
+    before each round; cache hits are free), and shrinks a candidate round
+    to what still fits.
     """
+    budget = TokenBudget(max_tokens_per_article)
+
     # One-time deterministic scrub
-    test_article = scrub_boilerplate(article_text)
+    test_article, scrubbed = scrub_boilerplate_report(article_text)
+    if scrubbed:
+        logger.info(f"Scrubbed {len(scrubbed)} stock phrases: {sorted(set(scrubbed))}")
+    flagged = flag_boilerplate(test_article)
+    if flagged:
+        logger.info(f"Flagged {len(flagged)} stock phrases for rewriting: {sorted(set(flagged))}")
 
     # Optional: one-time de-templating of the first sentence
     try:
-        test_article = detemplate_lede_once(test_article)
+        test_article = detemplate_lede_once(test_article, budget)
         logger.info("Applied one-time lede de-templating pass.")
     except Exception as exc:  # keep going if this fails
         logger.info(f"Skipping lede de-templating due to error: {exc}")
 
     counter = 0
+    llm_grades = 0
     prev_smoothed: Optional[int] = None
+    pending_grade: Optional[Tuple[int, Optional[int]]] = None  # grade of the chosen candidate, already known
 
-    # tracking best-so-far (by smoothed score)
+    # tracking best-so-far (by smoothed LLM score; local scores only as a fallback)
     best_score = 101
     best_article = test_article
     best_iter = 0
+    best_local: Optional[Tuple[int, str]] = None
 
-    # base-score improvement tracker
+    # improvement tracker (LLM grades when both rounds have one, else local scores)
     no_gain_streak = 0
     prev_base: Optional[int] = None
+    prev_local: Optional[int] = None
+
+    def _best() -> str:
+        if best_iter == 0 and best_local is not None:
+            logger.info(f"No LLM-graded version; returning the best local pre-grade ({best_local[0]}).")
+            return best_local[1]
+        logger.info(f"Returning best-so-far from iteration {best_iter} (score {best_score}).")
+        return best_article
+
+    def _finish(article: str) -> str:
+        logger.info(f"LLM grader used {llm_grades} times over {counter} iterations.")
+        logger.info(f"Editor spent {budget.used} tokens on this article.")
+        return article
 
     while counter < limit:
         counter += 1
         logger.info(f"Iteration {counter}")
 
         # 1) Grade
-        base = grade_base(test_article)
-        my_grade = smooth_score(prev_smoothed, base, momentum=0.6, deadband=1, max_step=12)
-        prev_smoothed = my_grade
-        logger.info(f"Base score: {base} | Smoothed score: {my_grade}")
-
-        # 2) Track best
-        if my_grade < best_score:
-            best_score = my_grade
-            best_article = test_article
-            best_iter = counter
-            logger.info(f"New best iteration: {counter} (score {my_grade})")
-
-        # 3) Stop if good enough
-        if my_grade <= threshold:
-            logger.info("✅ We have a human article!")
-            return test_article
-
-        # 4) Base-improvement tracking
-        if prev_base is not None and (prev_base - base) < require_base_improvement:
+        if pending_grade is None:
+            local, base = grade_article(
+                test_article, threshold, margin=pregrade_margin, budget=budget,
+                require_llm=llm_grades == 0,  # the local heuristic alone never steers a whole call
+            )
+            llm_grades += base is not None
+        else:
+            (local, base), pending_grade = pending_grade, None
+        if best_local is None or local < best_local[0]:
+            best_local = (local, test_article)
+
+        if base is not None:
+            my_grade = smooth_score(prev_smoothed, base, momentum=0.6, deadband=1, max_step=12)
+            prev_smoothed = my_grade
+            logger.info(f"Base score: {base} | Smoothed score: {my_grade}")
+
+            # 2) Track best
+            if my_grade < best_score:
+                best_score = my_grade
+                best_article = test_article
+                best_iter = counter
+                logger.info(f"New best iteration: {counter} (score {my_grade})")
+
+            # 3) Stop if good enough (only ever on an LLM grade)
+            if my_grade <= threshold:
+                logger.info("✅ We have a human article!")
+                return _finish(test_article)
+        else:
+            logger.info(f"Local pre-grade: {local} (no LLM grade this round)")
+
+        # 4) Improvement tracking, never across scales
+        if base is not None and prev_base is not None:
+            gain: Optional[int] = prev_base - base
+        elif prev_local is not None:
+            gain = prev_local - local
+        else:
+            gain = None
+        if gain is not None and gain < require_base_improvement:
             no_gain_streak += 1
         else:
             no_gain_streak = 0
-        prev_base = base
+        prev_base, prev_local = base, local
+
+        # 4.5) Stop once the token budget is spent, or cannot pay for another round.
+        #      Checked before submitting, so a candidate round never overshoots the cap
+        #      by more than the estimate's error.
+        affordable = max(1, candidates)
+        if budget.limit is not None:
+            affordable = budget.affordable(affordable, _round_cost(test_article))
+        if budget.exhausted or affordable == 0:
+            logger.info(f"Token budget of {budget.limit} reached ({budget.used} used). Stopping.")
+            return _finish(_best())
+        if affordable < candidates:
+            logger.info(f"Token budget left for {affordable} of {candidates} candidates this round.")
 
         # 5) If we're about to hit patience limit, do one aggressive pass
-        if no_gain_streak == no_gain_patience - 1 and counter < limit:
+        #    (candidate rounds already include an aggressive rewrite)
+        if candidates <= 1 and no_gain_streak == no_gain_patience - 1 and counter < limit:
             logger.info("Stagnation detected — applying one aggressive de-templating pass...")
-            test_article = humanize_article(test_article, score=base, mode="aggressive")
+            test_article = humanize_article(test_article, score=base, mode="aggressive", budget=budget)
             continue
 
         # 6) Early stop if still no progress
         if no_gain_streak >= no_gain_patience:
-            logger.info("No meaningful base-score improvement for consecutive rounds. Stopping early.")
-            logger.info(f"Returning best-so-far from iteration {best_iter} (score {best_score}).")
-            return best_article
+            logger.info("No meaningful score improvement for consecutive rounds. Stopping early.")
+            return _finish(_best())
+
+        # 7) Otherwise continue with gentle edits (or a round of candidates)
+        if counter == limit:
+            break  # the rewrite would never be graded
+        if candidates > 1:
+            logger.info(f"Generating {affordable} rewrite candidates...")
+            chosen = best_candidate(
+                test_article, base, affordable, threshold,
+                pregrade_margin=pregrade_margin,
+                rewrite_scope=rewrite_scope,
+                paragraphs_per_pass=paragraphs_per_pass,
+                budget=budget,
+            )
+            if chosen is None:
+                logger.info("All candidates failed. Stopping.")
+                return _finish(_best())
+            test_article, pending_grade, used = chosen
+            llm_grades += used
+            continue
 
-        # 7) Otherwise continue with gentle edits
         logger.info("Rewriting to sound more human...")
-        test_article = humanize_article(test_article, score=base, mode="gentle")
+        test_article = _rewrite(test_article, base, "gentle", rewrite_scope, paragraphs_per_pass, budget)
 
     logger.info("⚠️ Reached iteration limit without crossing threshold.")
-    logger.info(f"Returning best-so-far from iteration {best_iter} (score {best_score}).")
-    return best_article
+    return _finish(_best())
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+from urllib.parse import urlparse
+
+from utils.logger import logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# === Defaults ===
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_DOMAIN_DELAY = 4.0  # seconds between two requests to the same host
+
+
+def _host(url: str) -> str:
+    """Lowercased netloc of a URL ('' if it cannot be parsed)."""
+    try:
+        if not url.startswith(("http://", "https://")):
+            url = "http://" + url
+        return urlparse(url).netloc.lower()
+    except Exception:
+        return ""
+
+
+class DomainRateLimiter:
+    """
+    Per-host politeness: hands out request slots so that two requests to the
+    same host start at least `delay` seconds apart. Different hosts never
+    wait on each other.
+    """
+
+    def __init__(self, delay: float = DEFAULT_DOMAIN_DELAY):
+        self.delay = max(0.0, float(delay))
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str, delay: Optional[float] = None) -> None:
+        """
+        Block until `url`'s host may be contacted again, then hold the host
+        for `delay` seconds (the limiter's own delay if None).
+        """
+        host = _host(url)
+        gap = self.delay if delay is None else max(0.0, float(delay))
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + gap
+        pause = slot - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+
+# One limiter for the whole process: topics running in parallel share each
+# host's politeness budget instead of each getting their own.
+_shared_limiter = DomainRateLimiter()
+
+
+def _interleave_by_host(indexed: List[tuple], url_fn: Callable) -> List[tuple]:
+    """
+    Round-robin items across hosts so a long run of same-site URLs does not
+    occupy every worker while they queue behind the per-host delay.
+    """
+    buckets: "OrderedDict[str, List[tuple]]" = OrderedDict()
+    for pair in indexed:
+        buckets.setdefault(_host(url_fn(pair[1])), []).append(pair)
+
+    ordered: List[tuple] = []
+    while buckets:
+        for host in list(buckets):
+            ordered.append(buckets[host].pop(0))
+            if not buckets[host]:
+                del buckets[host]
+    return ordered
+
+
+def fetch_concurrently(
+    items: Iterable[T],
+    fetch_fn: Callable[[T], Optional[R]],
+    url_fn: Callable[[T], str] = str,
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    domain_delay: float = DEFAULT_DOMAIN_DELAY,
+    limiter: Optional[DomainRateLimiter] = None,
+    cached_fn: Optional[Callable[[T], bool]] = None,
+) -> List[Optional[R]]:
+    """
+    Run `fetch_fn` over `items` on a bounded thread pool, rate limited per host.
+    Unless a `limiter` is given, the per-host slots are shared with every other
+    fetch_concurrently() call in the process. Items for which `cached_fn`
+    returns True (e.g. http_cache.is_fresh) never hit the network, so they
+    skip the per-host wait.
+
+    Returns results in the same order as `items`. A failing item yields None
+    (the exception is logged) so one bad page never aborts the batch.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    limiter = limiter or _shared_limiter
+    results: List[Optional[R]] = [None] * len(items)
+
+    def _run(pair: tuple) -> None:
+        idx, item = pair
+        try:
+            cached = cached_fn is not None and cached_fn(item)
+        except Exception:
+            cached = False  # an unreadable cache means a real request: stay polite
+        if not cached:
+            limiter.wait(url_fn(item), domain_delay)
+        try:
+            results[idx] = fetch_fn(item)
+        except Exception as e:
+            logger.info(f"fetch_concurrently() - Failed fetching {url_fn(item)}: {e}")
+
+    ordered = _interleave_by_host(list(enumerate(items)), url_fn)
+    workers = max(1, min(max_workers, len(items)))
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+        list(pool.map(_run, ordered))
+
+    fetched = sum(r is not None for r in results)
+    logger.info(
+        f"Fetched {fetched}/{len(items)} pages with {workers} workers "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+    return results
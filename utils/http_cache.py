@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.compat import chardet
+
+from utils import http_client
+from utils.db_utils import db_session
+from utils.logger import logger
+
+# --- Paths ---
+BASE_DIR: Path = Path(__file__).resolve().parent.parent  # project root
+ASSETS_DIR: Path = BASE_DIR / "assets"
+CACHE_PATH: Path = ASSETS_DIR / "http_cache.db"
+
+# --- Limits ---
+DEFAULT_TTL = 30 * 24 * 3600        # pages are served from disk for 30 days
+MAX_CACHE_BYTES = 200 * 1024 * 1024  # compressed bodies, LRU-evicted above this
+REQUEST_TIMEOUT = 10
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+@dataclass
+class CachedResponse:
+    """Body of a GET, plus where it came from."""
+    url: str
+    status: int
+    content: bytes
+    encoding: Optional[str] = None
+    from_cache: bool = False
+    not_modified: bool = False  # server answered 304 to our validators
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+
+
+def sniff_encoding(content: bytes, content_type: Optional[str] = None) -> str:
+    """
+    Encoding of a page body: the Content-Type charset if the server sent one,
+    else a <meta charset>, else UTF-8 if the bytes decode as UTF-8, else a guess.
+    (requests assumes ISO-8859-1 for text/html without a charset, which
+    garbles UTF-8 pages served without one.)
+    """
+    declared = _HEADER_CHARSET.search(content_type or "")
+    if declared:
+        return declared.group(1)
+    meta = _META_CHARSET.search(content[:4096])
+    if meta:
+        return meta.group(1).decode("ascii", errors="ignore")
+    try:
+        content.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    guessed = chardet.detect(content).get("encoding") if chardet is not None else None
+    return guessed or "utf-8"
+
+
+def _migration_1(conn: sqlite3.Connection) -> None:
+    """Page bodies with their validators, plus LRU index."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            encoding TEXT,
+            body BLOB,
+            size INTEGER,
+            meta TEXT,
+            fetched_at REAL,
+            accessed_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache(accessed_at)")
+
+
+# Schema of http_cache.db, applied by utils.db_utils on first connection
+MIGRATIONS = (
+    _migration_1,
+)
+
+
+def _load(url: str) -> Optional[sqlite3.Row]:
+    with db_session(CACHE_PATH, MIGRATIONS) as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        return cursor.execute("SELECT * FROM http_cache WHERE url = ?", (url,)).fetchone()
+
+
+def _touch(url: str, revalidated: bool = False) -> None:
+    """Mark an entry used; `revalidated` also restarts its TTL (the server confirmed it with a 304)."""
+    now = time.time()
+    with db_session(CACHE_PATH, MIGRATIONS) as conn:
+        if revalidated:
+            conn.execute("UPDATE http_cache SET accessed_at = ?, fetched_at = ? WHERE url = ?", (now, now, url))
+        else:
+            conn.execute("UPDATE http_cache SET accessed_at = ? WHERE url = ?", (now, url))
+
+
+def _store(url: str, response: requests.Response) -> None:
+    body = zlib.compress(response.content, 6)
+    now = time.time()
+    with db_session(CACHE_PATH, MIGRATIONS) as conn:
+        conn.execute("""
+            INSERT INTO http_cache (url, etag, last_modified, encoding, body, size, fetched_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                encoding = excluded.encoding,
+                body = excluded.body,
+                size = excluded.size,
+                fetched_at = excluded.fetched_at,
+                accessed_at = excluded.accessed_at
+        """, (
+            url,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            sniff_encoding(response.content, response.headers.get("Content-Type")),
+            body,
+            len(body),
+            now,
+            now,
+        ))
+        _evict(conn)
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    """Drop expired entries, then least-recently-used ones until under MAX_CACHE_BYTES. Caller holds a db_session."""
+    conn.execute("DELETE FROM http_cache WHERE accessed_at < ?", (time.time() - DEFAULT_TTL,))
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+    if total <= MAX_CACHE_BYTES:
+        return
+    evicted = 0
+    for url, size in conn.execute("SELECT url, size FROM http_cache ORDER BY accessed_at").fetchall():
+        if total <= MAX_CACHE_BYTES:
+            break
+        conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+        total -= size or 0
+        evicted += 1
+    logger.info(f"[http_cache] - Evicted {evicted} entries to stay under {MAX_CACHE_BYTES} bytes")
+
+
+def _from_row(row: sqlite3.Row, **flags) -> CachedResponse:
+    content = zlib.decompress(row["body"])
+    encoding = row["encoding"]
+    if not encoding or encoding.lower() == "iso-8859-1":
+        encoding = sniff_encoding(content)  # rows stored with requests' header-less default
+    return CachedResponse(
+        url=row["url"],
+        status=200,
+        content=content,
+        encoding=encoding,
+        from_cache=True,
+        **flags,
+    )
+
+
+def is_fresh(url: str, ttl: Optional[float] = DEFAULT_TTL) -> bool:
+    """True if cached_get(url, ttl=ttl) would be served from disk without a request."""
+    row = _load(url)
+    return row is not None and (ttl is None or time.time() - row["fetched_at"] < ttl)
+
+
+def cached_get(
+    url: str,
+    *,
+    revalidate: bool = False,
+    ttl: Optional[float] = DEFAULT_TTL,
+    timeout: float = REQUEST_TIMEOUT,
+) -> CachedResponse:
+    """
+    GET `url` through the on-disk cache.
+
+    - revalidate=False: a cached copy younger than `ttl` is returned without
+      touching the network (article pages).
+    - revalidate=True: always ask the server, sending If-None-Match /
+      If-Modified-Since; a 304 returns the cached body with not_modified=True
+      (feeds).
+
+    Raises requests exceptions for network errors and non-2xx responses.
+    """
+    row = _load(url)
+
+    if row is not None and not revalidate:
+        if ttl is None or time.time() - row["fetched_at"] < ttl:  # same test as is_fresh()
+            _touch(url)
+            return _from_row(row)
+
+    headers = {"User-Agent": USER_AGENT}
+    if row is not None:
+        if row["etag"]:
+            headers["If-None-Match"] = row["etag"]
+        if row["last_modified"]:
+            headers["If-Modified-Since"] = row["last_modified"]
+
+    response = http_client.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and row is not None:
+        _touch(url, revalidated=True)
+        return _from_row(row, not_modified=True)
+
+    response.raise_for_status()
+    _store(url, response)
+    return CachedResponse(
+        url=url,
+        status=response.status_code,
+        content=response.content,
+        encoding=sniff_encoding(response.content, response.headers.get("Content-Type")),
+    )
+
+
+def get_meta(url: str) -> Optional[dict]:
+    """Caller-defined metadata stored next to a cached URL (e.g. a feed's entry links)."""
+    row = _load(url)
+    if row is None or not row["meta"]:
+        return None
+    try:
+        return json.loads(row["meta"])
+    except ValueError:
+        return None
+
+
+def set_meta(url: str, meta: dict) -> None:
+    """Attach metadata to an already-cached URL."""
+    with db_session(CACHE_PATH, MIGRATIONS) as conn:
+        conn.execute("UPDATE http_cache SET meta = ? WHERE url = ?", (json.dumps(meta), url))
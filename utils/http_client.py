@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.logger import logger
+
+# === Defaults ===
+DEFAULT_TIMEOUT = 30          # seconds, per request (connect + read)
+DEFAULT_RETRIES = 3           # transport errors and retryable statuses
+DEFAULT_BACKOFF = 0.5         # 0.5s, 1s, 2s ... between retries
+DEFAULT_POOL_SIZE = 16        # keep-alive connections kept per host
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"count": 0, "errors": 0, "seconds": 0.0})
+_stats_lock = threading.Lock()
+
+
+def _build_session(
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    pool_size: int = DEFAULT_POOL_SIZE,
+) -> requests.Session:
+    # POST is deliberately not retried: creating a post twice is worse than failing once.
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def configure(
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    pool_size: int = DEFAULT_POOL_SIZE,
+) -> None:
+    """Replace the shared session with one using the given retry/pool settings."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = _build_session(retries, backoff, pool_size)
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _record(host: str, seconds: float, failed: bool) -> None:
+    with _stats_lock:
+        entry = _stats[host]
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        if failed:
+            entry["errors"] += 1
+
+
+def request(method: str, url: str, *, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Send a request over the shared keep-alive pool.
+    Same signature and return value as requests.request().
+    """
+    host = urlparse(url).netloc.lower()
+    started = time.monotonic()
+    try:
+        response = get_session().request(method, url, timeout=timeout, **kwargs)
+    except Exception:
+        _record(host, time.monotonic() - started, failed=True)
+        raise
+    _record(host, time.monotonic() - started, failed=response.status_code >= 400)
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    """Per-host request counts, error counts and average latency (ms)."""
+    with _stats_lock:
+        return {
+            host: {
+                "count": int(s["count"]),
+                "errors": int(s["errors"]),
+                "avg_ms": round(1000 * s["seconds"] / s["count"], 1) if s["count"] else 0.0,
+                "total_s": round(s["seconds"], 2),
+            }
+            for host, s in _stats.items()
+        }
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def log_stats() -> None:
+    """Write one line per host with request count and latency to the log."""
+    for host, s in sorted(get_stats().items(), key=lambda kv: -kv[1]["count"]):
+        logger.info(
+            f"[http_client] {host}: {s['count']} requests, {s['errors']} errors, "
+            f"avg {s['avg_ms']} ms, total {s['total_s']} s"
+        )
@@ -7,11 +7,14 @@ if str(root_dir) not in sys.path:
     sys.path.append(str(root_dir))
 
 from utils.logger import logger
+import hashlib
 import os
+import time
+import uuid
+from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
-import requests
+from utils import http_client, llm
 from PIL import Image, ImageDraw, ImageFont
 from dataclasses import dataclass
 from typing import List, Tuple, Optional
@@ -23,12 +26,6 @@ load_dotenv(dotenv_path)
 assets_dir = base_dir / "assets"
 assets_dir.mkdir(exist_ok=True)
 
-# OpenAI client
-openai_key = os.getenv("OPENAI_API_KEY")
-if not openai_key:
-    logger.error("OPENAI_API_KEY is not set in the environment.")
-client = OpenAI(api_key=openai_key)
-
 
 # === Main Functions ===
 
@@ -39,7 +36,8 @@ def generate_image_prompt(article_summary: str, system_prompt: str) -> str:
         {"role": "user", "content": f"Article summary:\n{article_summary.strip()}\n\nWrite the final image prompt."},
     ]
 
-    response = client.chat.completions.create(
+    response = llm.chat_completion(
+        "image.prompt",
         model="gpt-4o-mini",  # good balance of speed and creativity
         messages=messages,
         temperature=0.8,      # slightly creative to vary scene composition
@@ -62,60 +60,77 @@ def generate_image(prompt: str) -> str:
     #size = "1024x1024"
     size = "1792x1024"
     model = "dall-e-3"
-    retries = 2
 
-    for attempt in range(1, retries + 1):
-        try:
-            response = client.images.generate(
-                prompt=prompt,
-                model=model,
-                size=size,
-                n=1
-            )
-            image_url = response.data[0].url
-            logger.info("Image generated successfully.")
-            return image_url
-        except Exception as e:
-            logger.warning(f"[Attempt {attempt}/{retries}] Image generation failed: {e}")
-
-    logger.error("All image generation attempts failed.")
-    return None
-
-
-def download_image(image_url: str) -> str:
+    # Retries with backoff (429/5xx) are handled by the llm gateway
+    try:
+        response = llm.generate_image(
+            "image.generate",
+            prompt=prompt,
+            model=model,
+            size=size,
+            n=1
+        )
+        image_url = response.data[0].url
+        logger.info("Image generated successfully.")
+        return image_url
+    except Exception as e:
+        logger.error(f"Image generation failed: {e}")
+        return None
+
+
+# === Image artifacts ===
+# Every image lives under assets/images/ as <run id>_<content hash>.jpg, so
+# topics (and separate processes) never write to the same file.
+IMAGES_DIR = assets_dir / "images"
+RUN_ID = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+CHUNK_SIZE = 64 * 1024
+IMAGE_RETENTION_DAYS = float(os.getenv("IMAGE_RETENTION_DAYS", "7"))
+
+
+def _artifact_path(digest: str, suffix: str = "") -> Path:
+    return IMAGES_DIR / f"{RUN_ID}_{digest[:16]}{suffix}.jpg"
+
+
+def download_image(image_url: str) -> Path:
     """
-    Download an image from a URL and save it as featured_image.jpg.
+    Stream an image from a URL into the artifact store, hashing it on the way.
 
     Args:
         image_url (str): The URL of the image to download.
 
     Returns:
-        str: Path to the saved image file.
+        Path: Path to the saved image file (named after its SHA-256).
     """
     logger.info("Downloading image...")
+    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    part_path = IMAGES_DIR / f".{RUN_ID}_{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
 
     try:
-        response = requests.get(image_url)
+        response = http_client.get(image_url, timeout=60, stream=True)
         response.raise_for_status()
+        with response, open(part_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    digest.update(chunk)
+                    f.write(chunk)
     except Exception as e:
+        part_path.unlink(missing_ok=True)
         logger.error(f"Failed to download image: {e}")
         raise
 
-    file_path = assets_dir / "featured_image.jpg"
-    try:
-        with open(file_path, "wb") as f:
-            f.write(response.content)
-        logger.info(f"Image saved to {file_path}")
-    except Exception as e:
-        logger.error(f"Failed to save downloaded image: {e}")
-        raise
-
+    file_path = _artifact_path(digest.hexdigest())
+    os.replace(part_path, file_path)  # atomic: readers never see a partial file
+    logger.info(f"Image saved to {file_path}")
     return file_path
 
 
-def crop_to_size(path: str) -> None:
+def crop_to_size(path: str) -> Path:
     """
-    Crop an image to 1024x537 and overwrite it.
+    Crop an image to 1024x537 and save it next to the original.
+
+    Returns:
+        Path: Path to the cropped copy.
     """
     logger.info(f"Cropping image: {path}")
 
@@ -129,36 +144,62 @@ def crop_to_size(path: str) -> None:
         bottom = top + 537
 
         cropped_image = image.crop((left, top, right, bottom))
-        save_path = assets_dir / "featured_image.jpg"
+        save_path = Path(path).with_name(f"{Path(path).stem}_cropped.jpg")
         cropped_image.save(save_path)
 
         logger.info(f"Cropped image saved to {save_path}")
+        return save_path
     except Exception as e:
         logger.error(f"Failed to crop image: {e}")
         raise
 
-def process_image(system_prompt: str, article_summary: str) -> bool:
 
+def cleanup_images(max_age_days: float = IMAGE_RETENTION_DAYS) -> int:
+    """
+    Delete images (and leftover partial downloads) older than `max_age_days`.
+    Returns the number of files removed.
+    """
+    if not IMAGES_DIR.exists():
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for path in IMAGES_DIR.iterdir():
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError as e:
+            logger.warning(f"Could not remove old image {path}: {e}")
+    if removed:
+        logger.info(f"Removed {removed} image(s) older than {max_age_days:g} days")
+    return removed
+
+
+def process_image(system_prompt: str, article_summary: str) -> Optional[str]:
+    """
+    Generate, download and store a featured image for an article.
+
+    Returns:
+        str | None: Path to the image file, or None if any step failed.
+    """
     logger.info("Starting image pipeline...")
     # The real first step is generating the prompt
-    prompt = generate_image_prompt(system_prompt, article_summary)
+    prompt = generate_image_prompt(article_summary, system_prompt)
 
     try:
         # 1) Generate
         image_url = generate_image(prompt)
         if not image_url:
             logger.error("Image generation failed (no URL).")
-            return False
+            return None
 
         # 2) Download
-        downloaded_path = download_image(image_url)
-
-        featured_path = assets_dir / "featured_image.jpg"
+        featured_path = download_image(image_url)
 
         logger.info(f"Image saved at: {featured_path}")
         logger.info("Image pipeline finished successfully.")
-        return True
+        return str(featured_path)
 
     except Exception as e:
         logger.error(f"Image pipeline failed: {e}")
-        return False
\ No newline at end of file
+        return None
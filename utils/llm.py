@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from openai.types.chat import ChatCompletion
+from openai.types.responses import Response
+
+from utils import llm_cache, rate_limit
+from utils.logger import logger
+
+# === Setup ===
+base_dir = Path(__file__).resolve().parent.parent  # project root
+dotenv_path = os.path.join(base_dir, ".env")
+load_dotenv(dotenv_path)
+
+# === Defaults ===
+DEFAULT_TIMEOUT = 120.0   # seconds per attempt
+MAX_RETRIES = 4           # retries after the first attempt
+BASE_DELAY = 1.0          # exponential backoff: 1s, 2s, 4s, 8s (+ jitter)
+MAX_DELAY = 60.0
+RETRY_STATUSES = {408, 409, 429}
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+_usage: Dict[str, Dict[str, float]] = defaultdict(
+    lambda: {"calls": 0, "errors": 0, "cache_hits": 0, "seconds": 0.0,
+             "prompt_tokens": 0, "completion_tokens": 0}
+)
+_usage_lock = threading.Lock()
+
+
+def get_client() -> OpenAI:
+    """
+    Shared OpenAI client (one HTTP connection pool for the whole process).
+    The SDK's own retries are off; _call() does retries with backoff instead.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    logger.error("OPENAI_API_KEY is not set in the environment.")
+                _client = OpenAI(api_key=api_key, max_retries=0, timeout=DEFAULT_TIMEOUT)
+    return _client
+
+
+# === Retry policy ===
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (RateLimitError, APIConnectionError, InternalServerError)):
+        return True  # APIConnectionError covers timeouts
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in RETRY_STATUSES or exc.status_code >= 500
+    return False
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Seconds to wait as requested by the server (retry-after-ms / Retry-After)."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _backoff(attempt: int) -> float:
+    delay = min(MAX_DELAY, BASE_DELAY * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)  # jitter so threads don't retry in lockstep
+
+
+# === Usage accounting ===
+def _record_cache_hit(call_site: str) -> None:
+    with _usage_lock:
+        _usage[call_site]["cache_hits"] += 1
+
+
+def _record(call_site: str, seconds: float, response: Any = None, failed: bool = False) -> None:
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None) or 0
+    with _usage_lock:
+        entry = _usage[call_site]
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["prompt_tokens"] += prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+        if failed:
+            entry["errors"] += 1
+
+
+def get_usage() -> Dict[str, Dict[str, float]]:
+    """Per-call-site call counts, errors, cache hits, latency and token usage."""
+    with _usage_lock:
+        return {
+            site: {
+                "calls": int(u["calls"]),
+                "errors": int(u["errors"]),
+                "cache_hits": int(u["cache_hits"]),
+                "avg_s": round(u["seconds"] / u["calls"], 2) if u["calls"] else 0.0,
+                "prompt_tokens": int(u["prompt_tokens"]),
+                "completion_tokens": int(u["completion_tokens"]),
+            }
+            for site, u in _usage.items()
+        }
+
+
+def log_usage() -> None:
+    """Write one line per call site with latency and token totals to the log."""
+    for site, u in sorted(get_usage().items()):
+        logger.info(
+            f"[llm] {site}: {u['calls']} calls, {u['errors']} errors, "
+            f"{u['cache_hits']} cache hits, avg {u['avg_s']} s, "
+            f"tokens in/out {u['prompt_tokens']}/{u['completion_tokens']}"
+        )
+
+
+# === Gateway ===
+def _call(call_site: str, fn: Callable[..., Any], *, timeout: float, **kwargs) -> Any:
+    """Run one API call with per-attempt timeout, backoff and usage recording."""
+    budget = rate_limit.limit("openai")  # shared by every topic worker
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with budget:
+                started = time.monotonic()
+                response = fn(timeout=timeout, **kwargs)
+        except Exception as exc:
+            _record(call_site, time.monotonic() - started, failed=True)
+            if not _is_retryable(exc) or attempt == MAX_RETRIES:
+                raise
+            delay = _retry_after(exc)
+            delay = _backoff(attempt) if delay is None else min(delay, MAX_DELAY)
+            if isinstance(exc, RateLimitError):
+                budget.pause(delay)  # back off every caller, not just this one
+            logger.warning(
+                f"[llm] {call_site}: {type(exc).__name__} "
+                f"(attempt {attempt + 1}/{MAX_RETRIES + 1}); retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            continue
+
+        _record(call_site, time.monotonic() - started, response)
+        return response
+
+
+def _cached_call(
+    call_site: str,
+    endpoint: str,
+    response_type: Any,
+    fn: Callable[..., Any],
+    *,
+    cache: bool,
+    timeout: float,
+    **kwargs,
+) -> Any:
+    """
+    _call() behind the completion cache (see utils/llm_cache.py).
+    Reads happen in replay mode, or when the caller opts in with cache=True
+    for a deterministic (temperature 0) request. Every fresh response is
+    recorded unless the cache is off.
+    """
+    mode = llm_cache.get_mode()
+    if mode == "off":
+        return _call(call_site, fn, timeout=timeout, **kwargs)
+
+    key = llm_cache.make_key(endpoint, kwargs)
+    if mode == "replay" or (cache and kwargs.get("temperature") == 0):
+        hit = llm_cache.lookup(key)
+        if hit is not None:
+            try:
+                response = response_type.model_validate_json(hit)
+            except Exception as e:
+                logger.warning(f"[llm] {call_site}: unreadable cache entry ({e}); calling API")
+            else:
+                _record_cache_hit(call_site)
+                logger.info(f"[llm] {call_site}: served from cache")
+                response._from_cache = True  # see served_from_cache()
+                return response
+
+    response = _call(call_site, fn, timeout=timeout, **kwargs)
+    llm_cache.store(key, endpoint, kwargs.get("model"), response)
+    return response
+
+
+def served_from_cache(response: Any) -> bool:
+    """True if `response` came from the completion cache (no tokens were spent on it)."""
+    return bool(getattr(response, "_from_cache", False))
+
+
+def chat_completion(
+    call_site: str,
+    *,
+    client: Optional[OpenAI] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: bool = False,
+    **kwargs,
+):
+    """client.chat.completions.create(**kwargs) through the gateway."""
+    api = client or get_client()
+    return _cached_call(
+        call_site, "chat.completions", ChatCompletion, api.chat.completions.create,
+        cache=cache, timeout=timeout, **kwargs,
+    )
+
+
+def create_response(
+    call_site: str,
+    *,
+    client: Optional[OpenAI] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: bool = False,
+    **kwargs,
+):
+    """client.responses.create(**kwargs) through the gateway."""
+    api = client or get_client()
+    return _cached_call(
+        call_site, "responses", Response, api.responses.create,
+        cache=cache, timeout=timeout, **kwargs,
+    )
+
+
+def generate_image(
+    call_site: str,
+    *,
+    client: Optional[OpenAI] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    **kwargs,
+):
+    """client.images.generate(**kwargs) through the gateway."""
+    api = client or get_client()
+    return _call(call_site, api.images.generate, timeout=timeout, **kwargs)
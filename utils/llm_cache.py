@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+from utils.db_utils import db_session
+from utils.logger import logger
+
+# --- Paths ---
+BASE_DIR: Path = Path(__file__).resolve().parent.parent  # project root
+ASSETS_DIR: Path = BASE_DIR / "assets"
+CACHE_PATH: Path = ASSETS_DIR / "llm_cache.db"
+
+# --- Limits ---
+MAX_CACHE_BYTES = 100 * 1024 * 1024  # compressed responses, LRU-evicted above this
+
+# --- Modes ---
+#   off    : never read or write
+#   record : store every response; reuse only for opted-in deterministic calls
+#   replay : reuse any stored response for an identical request (reruns)
+MODES = ("off", "record", "replay")
+_mode = os.getenv("LLM_CACHE_MODE", "record").strip().lower()
+if _mode not in MODES:
+    logger.warning(f"[llm_cache] Unknown LLM_CACHE_MODE {_mode!r}; using 'record'.")
+    _mode = "record"
+
+
+def get_mode() -> str:
+    return _mode
+
+
+def set_mode(mode: str) -> None:
+    """Switch cache mode for this process ('off', 'record' or 'replay')."""
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unsupported LLM cache mode: {mode!r}")
+    _mode = mode
+    logger.info(f"[llm_cache] Mode set to {mode!r}")
+
+
+def make_key(endpoint: str, request: dict) -> str:
+    """Content address of a request: sha256 over endpoint, model, messages and sampling params."""
+    payload = json.dumps({"endpoint": endpoint, **request}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _migration_1(conn: sqlite3.Connection) -> None:
+    """Response cache table plus LRU index."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            endpoint TEXT,
+            model TEXT,
+            body BLOB,
+            size INTEGER,
+            created_at REAL,
+            accessed_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+
+
+# Schema of llm_cache.db, applied by utils.db_utils on first connection
+MIGRATIONS = (
+    _migration_1,
+)
+
+
+def lookup(key: str) -> Optional[str]:
+    """Stored response JSON for `key`, or None."""
+    try:
+        with db_session(CACHE_PATH, MIGRATIONS) as conn:
+            row = conn.execute("SELECT body FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return zlib.decompress(row[0]).decode("utf-8")
+    except (sqlite3.Error, zlib.error) as e:
+        logger.warning(f"[llm_cache] Lookup failed: {e}")
+        return None
+
+
+def store(key: str, endpoint: str, model: Optional[str], response: Any) -> None:
+    """Persist an OpenAI response object (pydantic) under `key`."""
+    try:
+        body = zlib.compress(response.model_dump_json().encode("utf-8"), 6)
+    except Exception as e:
+        logger.warning(f"[llm_cache] Could not serialize {endpoint} response: {e}")
+        return
+
+    now = time.time()
+    try:
+        with db_session(CACHE_PATH, MIGRATIONS) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO llm_cache (key, endpoint, model, body, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (key, endpoint, model, body, len(body), now, now))
+            _evict(conn)
+    except sqlite3.Error as e:
+        logger.warning(f"[llm_cache] Store failed: {e}")
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    """Drop least-recently-used responses until under MAX_CACHE_BYTES. Caller holds a db_session."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+    if total <= MAX_CACHE_BYTES:
+        return
+    evicted = 0
+    for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at").fetchall():
+        if total <= MAX_CACHE_BYTES:
+            break
+        conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        total -= size or 0
+        evicted += 1
+    logger.info(f"[llm_cache] Evicted {evicted} responses to stay under {MAX_CACHE_BYTES} bytes")
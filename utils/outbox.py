@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils import poster
+from utils.db_utils import ASSETS_DIR, DB_PATH, db_session, save_generated_article
+from utils.logger import logger
+
+# --- Paths ---
+OUTBOX_DIR: Path = ASSETS_DIR / "outbox"  # images owned by pending entries
+
+# === Retry policy ===
+MAX_ATTEMPTS = 8        # after this many failed attempts an entry is marked 'failed'
+RETRIES_PER_RUN = 3     # attempts for a freshly finished article before leaving it for a later run
+BASE_DELAY = 5.0        # seconds; doubles per attempt
+MAX_DELAY = 60.0        # cap for in-run sleeps
+RETRY_AFTER = 15 * 60   # earliest re-attempt of a pending entry by a later run (seconds, doubled per attempt)
+
+
+def idempotency_key(base: dict) -> str:
+    """Stable key for one article: the same finished post is never enqueued twice."""
+    fingerprint = json.dumps(
+        [base.get("language"), base.get("title"), base.get("content")], ensure_ascii=False
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def post_key(key: str, language: Optional[str]) -> str:
+    """
+    Idempotency key of one post of an entry, stored in WordPress post meta so
+    a retry can look the post up instead of creating it again.
+    """
+    return f"{key}:{(language or 'en').lower()}"
+
+
+def enqueue(
+    base: dict,
+    siblings: List[dict],
+    *,
+    topic: Optional[str] = None,
+    image_path: Optional[str] = None,
+    record: Optional[dict] = None,
+    db_path=DB_PATH,
+) -> int:
+    """
+    Store a finished article group (post_to_wordpress() kwargs for the base
+    post and each translation) for publishing. `image_path` is uploaded as the
+    featured image; `record` is passed to save_generated_article() once the
+    base post is live. Returns the outbox id (the existing one for a repeat).
+    """
+    key = idempotency_key(base)
+    base = {**base, "idempotency_key": post_key(key, base.get("language"))}
+    siblings = [{**s, "idempotency_key": post_key(key, s.get("language"))} for s in siblings]
+    source = Path(image_path) if image_path else None
+    if source is not None:
+        # Pipeline images are pruned after a few days; the entry keeps its own copy until published
+        image_path = str(OUTBOX_DIR / f"{key[:16]}{source.suffix}")
+    payload = json.dumps(
+        {"base": base, "siblings": siblings, "image_path": image_path, "record": record},
+        ensure_ascii=False,
+    )
+    now = datetime.utcnow().isoformat()
+    with db_session(db_path) as conn:
+        inserted = conn.execute("""
+            INSERT INTO publish_outbox (idempotency_key, topic, payload, progress, dt_created, dt_updated)
+            VALUES (?, ?, ?, '{}', ?, ?)
+            ON CONFLICT(idempotency_key) DO NOTHING
+        """, (key, topic, payload, now, now)).rowcount
+        if inserted and source is not None:
+            # Copy only for a new row; a failed copy rolls the insert back
+            OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, image_path)
+        entry_id = conn.execute(
+            "SELECT id FROM publish_outbox WHERE idempotency_key = ?", (key,)
+        ).fetchone()[0]
+    logger.info(f"[outbox] - Enqueued article group #{entry_id} ({1 + len(siblings)} posts)")
+    return entry_id
+
+
+def _load(entry_id: int, db_path) -> Optional[tuple]:
+    with db_session(db_path) as conn:
+        return conn.execute(
+            "SELECT payload, progress, status, attempts FROM publish_outbox WHERE id = ?", (entry_id,)
+        ).fetchone()
+
+
+def _save_progress(entry_id: int, progress: dict, db_path) -> None:
+    with db_session(db_path) as conn:
+        conn.execute(
+            "UPDATE publish_outbox SET progress = ?, dt_updated = ? WHERE id = ?",
+            (json.dumps(progress), datetime.utcnow().isoformat(), entry_id),
+        )
+
+
+def _finish_attempt(entry_id: int, attempts: int, error: Optional[str], db_path) -> str:
+    if error is None:
+        status, next_at = "published", None
+    elif attempts >= MAX_ATTEMPTS:
+        status, next_at = "failed", None
+    else:
+        status, next_at = "pending", time.time() + RETRY_AFTER * 2 ** (attempts - 1)
+    with db_session(db_path) as conn:
+        conn.execute("""
+            UPDATE publish_outbox
+            SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, dt_updated = ?
+            WHERE id = ?
+        """, (status, attempts, error, next_at, datetime.utcnow().isoformat(), entry_id))
+    return status
+
+
+def _recover_posts(posts_kwargs, posts: Dict[str, dict], since: Optional[float], on_found) -> None:
+    """Record posts that already exist in WordPress under the entry's idempotency keys."""
+    pending = {
+        post["idempotency_key"]: poster._normalize_lang_code(post.get("language"))
+        for post in posts_kwargs
+        if post.get("idempotency_key") and poster._normalize_lang_code(post.get("language")) not in posts
+    }
+    if not pending:
+        return
+    for key, found in poster.find_posts_by_key(pending, since=since).items():
+        code = pending[key]
+        logger.info(f"[outbox] - Found earlier {code} post #{found['id']}; not creating it again")
+        on_found(code, found)
+
+
+def _attempt(entry_id: int, db_path) -> Optional[Dict[str, dict]]:
+    """
+    One publishing attempt. Languages already live (recorded by earlier attempts,
+    or found in WordPress by their idempotency key) are skipped, so a retry
+    never duplicates a post. Returns {code: {id, link}}
+    for every live post, or None if the entry is unknown.
+    """
+    row = _load(entry_id, db_path)
+    if row is None:
+        return None
+    if row[2] != "pending":
+        return json.loads(row[1] or "{}").get("posts", {})  # already published (or given up)
+    payload, progress = json.loads(row[0]), json.loads(row[1] or "{}")
+    attempts = row[3] + 1
+    posts: Dict[str, dict] = progress.setdefault("posts", {})
+
+    # Featured image: uploaded once, reused by every language and retry
+    image_path = payload.get("image_path")
+    if image_path and not progress.get("media_id"):
+        media_id = poster.upload_featured_image(image_path)
+        if media_id:
+            progress["media_id"] = media_id
+            _save_progress(entry_id, progress, db_path)
+    base, siblings = payload["base"], payload["siblings"]
+    if progress.get("media_id"):
+        for post in (base, *siblings):
+            post["featured_image_id"] = progress["media_id"]
+
+    def _created(code: str, data: dict) -> None:
+        posts[code] = {"id": int(data["id"]), "link": data.get("link")}
+        _save_progress(entry_id, progress, db_path)
+
+    error = None
+    if progress.get("started"):
+        # An earlier attempt may have created posts without recording them
+        # (crash or timeout after WordPress answered): find them by key first.
+        started = progress["started"]
+        since = None if started is True else started  # entries queued before the timestamp was kept
+        try:
+            _recover_posts((base, *siblings), posts, since, _created)
+        except Exception as exc:
+            error = f"Lookup of earlier posts failed: {type(exc).__name__}: {exc}"
+    else:
+        progress["started"] = time.time()
+        _save_progress(entry_id, progress, db_path)
+
+    if error is None:  # never create while it is unknown what already exists
+        try:
+            poster.publish_post_group(base, siblings, already_posted=posts, on_created=_created)
+        except Exception as exc:  # keep the entry; the next attempt resumes from `progress`
+            error = f"{type(exc).__name__}: {exc}"
+
+    base_code = poster._normalize_lang_code(base.get("language")) or "en"
+    base_post = posts.get(base_code)
+    record = payload.get("record")
+    if base_post and record and not progress.get("recorded"):
+        save_generated_article(**record, link=base_post.get("link"), dt_published=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        progress["recorded"] = True
+        _save_progress(entry_id, progress, db_path)
+
+    wanted = {base_code, *(poster._normalize_lang_code(s.get("language")) for s in siblings)}
+    missing = sorted(code for code in wanted if code not in posts)
+    if error is None and missing:
+        error = f"Not published yet: {', '.join(missing)}"
+    status = _finish_attempt(entry_id, attempts, error, db_path)
+    if status != "pending" and image_path and Path(image_path).parent == OUTBOX_DIR:
+        Path(image_path).unlink(missing_ok=True)
+    log = logger.info if status == "published" else logger.warning
+    log(f"[outbox] - Entry #{entry_id} attempt {attempts}: {status}" + (f" ({error})" if error else ""))
+    return posts
+
+
+def publish(entry_id: int, retries: int = RETRIES_PER_RUN, db_path=DB_PATH) -> Dict[str, dict]:
+    """
+    Publish an outbox entry, retrying with exponential backoff up to `retries`
+    times in this run. Returns {code: {id, link}} for the posts that are live.
+    """
+    posts: Dict[str, dict] = {}
+    for attempt in range(retries):
+        posts = _attempt(entry_id, db_path) or posts
+        row = _load(entry_id, db_path)
+        if row is None or row[2] != "pending":
+            break
+        if attempt + 1 < retries:
+            delay = min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+            logger.info(f"[outbox] - Retrying entry #{entry_id} in {delay:.0f}s")
+            time.sleep(delay)
+    return posts
+
+
+def drain(retries: int = 1, db_path=DB_PATH) -> Dict[str, int]:
+    """
+    Publish every pending entry that is due (e.g. left over from a run where
+    WordPress was down). Returns counts per resulting status.
+    """
+    with db_session(db_path) as conn:
+        due = [r[0] for r in conn.execute("""
+            SELECT id FROM publish_outbox
+            WHERE status = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+            ORDER BY id
+        """, (time.time(),)).fetchall()]
+    if not due:
+        return {}
+
+    logger.info(f"[outbox] - Draining {len(due)} pending article group(s)")
+    for entry_id in due:
+        publish(entry_id, retries=retries, db_path=db_path)
+
+    with db_session(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT status, COUNT(*) FROM publish_outbox WHERE id IN ({','.join('?' * len(due))}) GROUP BY status",
+            due,
+        ).fetchall()
+    counts = dict(rows)
+    logger.info(f"[outbox] - Drain finished: {counts}")
+    return counts
@@ -0,0 +1,166 @@
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from utils.db_utils import DB_PATH, db_session
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One step of a per-topic pipeline.
+    `fn` is called with the outputs of `deps`, positionally and in order.
+    """
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    persist: bool = True  # checkpoint the output (must be JSON-serializable)
+
+
+class Checkpoint:
+    """
+    Stage outputs of one (run_date, topic) pipeline run, stored in the
+    pipeline_stages table so a restarted run skips what already finished.
+    """
+
+    def __init__(self, run_date: str, topic: str, db_path=DB_PATH):
+        self.run_date = run_date
+        self.topic = topic
+        self.db_path = db_path
+
+    def load(self) -> Dict[str, Any]:
+        """{stage name: output} for every stage that finished in this run."""
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT stage, output FROM pipeline_stages WHERE run_date = ? AND topic = ?",
+                (self.run_date, self.topic),
+            ).fetchall()
+        outputs = {}
+        for stage, output in rows:
+            try:
+                outputs[stage] = json.loads(output)
+            except ValueError:
+                logger.warning(f"Unreadable checkpoint for stage '{stage}'; it will run again")
+        return outputs
+
+    def save(self, stage: str, output: Any, duration: float) -> None:
+        try:
+            payload = json.dumps(output, ensure_ascii=False, default=str)
+        except (TypeError, ValueError) as exc:
+            logger.warning(f"Stage '{stage}' output is not serializable; not checkpointed ({exc})")
+            return
+        with db_session(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO pipeline_stages (run_date, topic, stage, output, duration, dt_finished)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (self.run_date, self.topic, stage, payload, duration, datetime.utcnow().isoformat()))
+
+    def durations(self) -> Dict[str, float]:
+        """Recorded duration (seconds) per finished stage."""
+        with db_session(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT stage, duration FROM pipeline_stages WHERE run_date = ? AND topic = ?",
+                (self.run_date, self.topic),
+            ).fetchall()
+        return dict(rows)
+
+
+def _validate(stages: Dict[str, Stage]) -> None:
+    for stage in stages.values():
+        missing = [d for d in stage.deps if d not in stages]
+        if missing:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown stage(s): {missing}")
+
+    # Kahn's algorithm: every stage must become runnable eventually
+    remaining = {name: set(stage.deps) for name, stage in stages.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_stages(
+    stages: Iterable[Stage],
+    max_workers: int = 4,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Dict[str, Any]:
+    """
+    Run stages as soon as their dependencies are done, independent ones in
+    parallel. Returns {stage name: output}.
+
+    If a stage raises, no new stages are started; stages already running are
+    allowed to finish and the first error is re-raised.
+
+    With a checkpoint, stages that finished in an earlier attempt of the same
+    run are restored instead of re-run, and each newly finished stage is saved.
+    """
+    by_name: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name!r}")
+        by_name[stage.name] = stage
+    _validate(by_name)
+
+    results: Dict[str, Any] = {}
+    durations: Dict[str, float] = {}
+    pending = dict(by_name)
+    running: Dict[Future, str] = {}
+    error = None
+    started = time.monotonic()
+
+    if checkpoint is not None:
+        saved = checkpoint.load()
+        for name, stage in by_name.items():
+            if stage.persist and name in saved:
+                results[name] = saved[name]
+                del pending[name]
+        if len(pending) < len(by_name):
+            logger.info(f"Resuming: restored stages {sorted(set(by_name) - set(pending))} from checkpoint")
+
+    def _timed(stage: Stage, args: list) -> Any:
+        t0 = time.monotonic()
+        try:
+            return stage.fn(*args)
+        finally:
+            durations[stage.name] = time.monotonic() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+        while pending or running:
+            if error is None:
+                for name, stage in list(pending.items()):
+                    if all(d in results for d in stage.deps):
+                        args = [results[d] for d in stage.deps]
+                        running[pool.submit(_timed, stage, args)] = name
+                        del pending[name]
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as exc:
+                    logger.error(f"Stage '{name}' failed: {exc}")
+                    error = error or exc
+                    continue
+                logger.info(f"Stage '{name}' finished in {durations.get(name, 0):.1f}s")
+                if checkpoint is not None and by_name[name].persist:
+                    checkpoint.save(name, results[name], durations.get(name, 0.0))
+
+    if error is not None:
+        raise error
+
+    total = time.monotonic() - started
+    logger.info(
+        f"Pipeline finished in {total:.1f}s (stage sum {sum(durations.values()):.1f}s)"
+    )
+    return results
@@ -3,12 +3,15 @@ from __future__ import annotations
 
 import os
 import mimetypes
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional, Union, List
+from typing import Callable, Iterable, Optional, Union, List
 
-import requests
 from requests.auth import HTTPBasicAuth
 from dotenv import load_dotenv
+from utils import http_client, rate_limit, taxonomy_cache
 from utils.logger import logger  # logger.py lives in the same folder
 
 # === Paths === (your preferred style)
@@ -35,6 +38,34 @@ if not WP_APP_PASSWORD:
 
 auth = HTTPBasicAuth(WP_USERNAME, WP_APP_PASSWORD)
 
+TERMS_PER_PAGE = 100  # WordPress REST maximum
+BATCH_LIMIT = 25      # default max sub-requests per /batch/v1 call
+# Post meta holding the outbox idempotency key. The site must register it for
+# REST (register_post_meta(..., show_in_rest => true)); see README.
+IDEMPOTENCY_META_KEY = "good_news_idempotency_key"
+LOOKUP_MAX_PAGES = 10  # newest-first pages scanned when looking for earlier posts
+_term_lock = threading.Lock()  # one create per unknown term, even with concurrent posts
+
+
+class RequestTally:
+    """Thread-safe count of WordPress requests spent on one article."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, n: int = 1) -> None:
+        with self._lock:
+            self.count += n
+
+
+def _wp(method: str, url: str, tally: Optional[RequestTally] = None, **kwargs):
+    """Authenticated WordPress request over the shared session, counted in `tally`."""
+    if tally is not None:
+        tally.add()
+    with rate_limit.limit("wordpress"):  # shared by every topic worker
+        return http_client.request(method, url, auth=auth, **kwargs)
+
 def upload_featured_image(image_path: str) -> Optional[int]:
     """
     Upload an image file to the WordPress Media Library.
@@ -53,7 +84,7 @@ def upload_featured_image(image_path: str) -> Optional[int]:
     try:
         with open(image_path, "rb") as f:
             files = {"file": (filename, f, content_type)}
-            resp = requests.post(WP_MEDIA_URL, auth=auth, headers=headers, files=files, timeout=60)
+            resp = _wp("POST", WP_MEDIA_URL, headers=headers, files=files, timeout=60)
     except Exception as exc:
         logger.exception("Image upload request failed: %s", exc)
         return None
@@ -69,39 +100,102 @@ def upload_featured_image(image_path: str) -> Optional[int]:
     logger.error("Image upload failed. Status=%s, Body=%s", resp.status_code, resp.text)
     return None
 
-def get_or_create_term(name: str, taxonomy: str) -> int:
+def prefetch_terms(taxonomy: str, tally: Optional[RequestTally] = None) -> int:
     """
-    Reuse your existing function. Added small niceties: timeout and exact match.
+    Download every term of a taxonomy ('tags' or 'categories') into the local
+    taxonomy cache, 100 per page, following X-WP-TotalPages.
+    Returns the number of terms cached.
     """
     url = f"{WP_API_BASE}/{taxonomy}"
+    terms: List[dict] = []
+    page, total_pages = 1, 1
+    while page <= total_pages:
+        response = _wp(
+            "GET",
+            url,
+            tally,
+            params={"per_page": TERMS_PER_PAGE, "page": page, "hide_empty": "false", "_fields": "id,name"},
+            timeout=30,
+        )
+        response.raise_for_status()
+        terms.extend(response.json() or [])
+        try:
+            total_pages = int(response.headers.get("X-WP-TotalPages", 1))
+        except ValueError:
+            total_pages = 1
+        page += 1
 
-    # Try to find it
-    try:
-        response = requests.get(url, params={"search": name}, auth=auth, timeout=30)
-    except Exception as exc:
-        logger.warning("Lookup failed for %s '%s': %s", taxonomy, name, exc)
-        response = None
+    logger.info("[poster.py] - Prefetched %d %s in %d request(s)", len(terms), taxonomy, page - 1)
+    return taxonomy_cache.replace_all(WP_API_BASE, taxonomy, terms)
 
-    if response and response.status_code == 200:
-        data = response.json() or []
-        for item in data:
-            if str(item.get("name", "")).lower() == name.lower():
-                return int(item["id"])
 
-    # If not found, try to create it
-    try:
-        response = requests.post(url, json={"name": name}, auth=auth, timeout=30)
-    except Exception as exc:
-        logger.info("[poster.py] - Failed to create %s '%s': %s", taxonomy[:-1], name, exc)
-        raise
+def _ensure_terms(taxonomy: str, tally: Optional[RequestTally] = None) -> None:
+    """Sync the taxonomy cache if it is empty or older than taxonomy_cache.SYNC_TTL."""
+    if not taxonomy_cache.is_stale(WP_API_BASE, taxonomy):
+        return
+    with _term_lock:
+        if taxonomy_cache.is_stale(WP_API_BASE, taxonomy):
+            try:
+                prefetch_terms(taxonomy, tally)
+            except Exception as exc:
+                logger.warning("Could not prefetch %s: %s", taxonomy, exc)
 
-    if response.status_code in (200, 201):
-        return int(response.json()["id"])
 
-    logger.info("[poster.py] - Failed to create %s '%s': %s", taxonomy[:-1], name, response.text)
-    raise Exception(f"Failed to create {taxonomy[:-1]} '{name}': {response.text}")
+def get_or_create_term(name: str, taxonomy: str, tally: Optional[RequestTally] = None) -> int:
+    """
+    Resolve a term name to its ID from the local taxonomy cache; only terms
+    WordPress has never seen are created (one POST each).
+    """
+    _ensure_terms(taxonomy, tally)
+    term_id = taxonomy_cache.lookup(WP_API_BASE, taxonomy, name)
+    if term_id is not None:
+        return term_id
+
+    url = f"{WP_API_BASE}/{taxonomy}"
+    with _term_lock:
+        # Another thread may have created it while we waited
+        term_id = taxonomy_cache.lookup(WP_API_BASE, taxonomy, name)
+        if term_id is not None:
+            return term_id
+
+        try:
+            response = _wp("POST", url, tally, json={"name": name}, timeout=30)
+        except Exception as exc:
+            logger.info("[poster.py] - Failed to create %s '%s': %s", taxonomy[:-1], name, exc)
+            raise
+
+        if response.status_code in (200, 201):
+            term_id = int(response.json()["id"])
+        else:
+            # The cache was behind: WordPress already has it and tells us the ID
+            try:
+                error = response.json() or {}
+            except ValueError:
+                error = {}
+            existing = (error.get("data") or {}).get("term_id") if error.get("code") == "term_exists" else None
+            if existing is None:
+                logger.info("[poster.py] - Failed to create %s '%s': %s", taxonomy[:-1], name, response.text)
+                raise Exception(f"Failed to create {taxonomy[:-1]} '{name}': {response.text}")
+            term_id = int(existing)
+
+        taxonomy_cache.add(WP_API_BASE, taxonomy, name, term_id)
+        return term_id
+
+
+def _rejected_taxonomies(response) -> List[str]:
+    """Taxonomies WordPress rejected in a failed post create (e.g. a cached term was deleted)."""
+    if response.status_code != 400:
+        return []
+    try:
+        error = response.json() or {}
+    except ValueError:
+        return []
+    if error.get("code") != "rest_invalid_param":
+        return []
+    params = (error.get("data") or {}).get("params") or {}
+    return [t for t in ("tags", "categories") if t in params]
 
-def _force_set_language(post_id: int, slug: str) -> bool:
+def _force_set_language(post_id: int, slug: str, tally: Optional[RequestTally] = None) -> bool:
     """
     Force-assign the post language after creation via Polylang.
     Works even if the create call ignored ?lang=...
@@ -109,7 +203,7 @@ def _force_set_language(post_id: int, slug: str) -> bool:
     try:
         url = f"{WP_POSTS_URL}/{post_id}"
         # POST with only query params; no JSON body needed
-        r = requests.post(url, auth=auth, params={"lang": slug}, timeout=30)
+        r = _wp("POST", url, tally, params={"lang": slug}, timeout=30)
         if r.status_code in (200, 201):
             logger.info("Language set → post %s → %s", post_id, slug)
             return True
@@ -122,6 +216,7 @@ def _force_set_language(post_id: int, slug: str) -> bool:
 def resolve_terms(
     terms: Optional[Iterable[Union[str, int]]],
     taxonomy: str,
+    tally: Optional[RequestTally] = None,
 ) -> List[int]:
     """
     Convert a mix of names/IDs into IDs, creating missing names via get_or_create_term().
@@ -138,7 +233,7 @@ def resolve_terms(
             resolved.append(term)
         elif isinstance(term, str) and term.strip():
             try:
-                term_id = get_or_create_term(term.strip(), taxonomy=taxonomy)
+                term_id = get_or_create_term(term.strip(), taxonomy=taxonomy, tally=tally)
                 resolved.append(int(term_id))
             except Exception as exc:
                 logger.warning("Skipping %s '%s' due to error: %s", taxonomy[:-1], term, exc)
@@ -160,7 +255,7 @@ def _polylang_rest_available() -> bool:
     """Best-effort check whether Polylang REST endpoints are available."""
     try:
         url = f"{WP_DOMAIN.rstrip('/')}/wp-json/pll/v1/languages"
-        resp = requests.get(url, auth=auth, timeout=15)
+        resp = _wp("GET", url, timeout=15)
         if resp.status_code == 200:
             logger.info("[poster.py] Polylang REST detected.")
             return True
@@ -178,6 +273,156 @@ def _normalize_lang_code(language: Optional[str]) -> Optional[str]:
     # allow simple codes like 'de', 'ru', 'fr' or longer like 'zh-cn'
     return code if 2 <= len(code) <= 5 else None
 
+_batch_probe: Optional[bool] = None  # answer of the last conclusive /wp-json/ probe
+
+
+def _batch_available() -> bool:
+    """
+    Whether the site exposes the core REST batch endpoint (WordPress 5.6+).
+    Only a conclusive answer (200 with the namespace list) is remembered for
+    the run; a timeout or 5xx falls back to single posts this time and the
+    next group probes again.
+    """
+    global _batch_probe
+    if _batch_probe is not None:
+        return _batch_probe
+    try:
+        resp = _wp("GET", f"{WP_DOMAIN.rstrip('/')}/wp-json/", timeout=15, params={"_fields": "namespaces"})
+        if resp.status_code != 200:
+            logger.info("[poster.py] Batch endpoint check returned %s; will retry next time.", resp.status_code)
+            return False
+        available = "batch/v1" in (resp.json() or {}).get("namespaces", [])
+    except Exception as exc:
+        logger.info("[poster.py] Batch endpoint check failed: %s", exc)
+        return False
+    logger.info("[poster.py] REST batch endpoint %s.", "available" if available else "not available")
+    _batch_probe = available
+    return available
+
+
+def _merge_terms(tags=None, tag_ids=None, categories=None, category_ids=None) -> dict:
+    """{taxonomy: names and/or IDs} from post_to_wordpress()-style arguments."""
+    return {
+        "tags": [*(tags or []), *(tag_ids or [])],
+        "categories": [*(categories or []), *(category_ids or [])],
+    }
+
+
+def _build_payload(
+    title: str,
+    content: str,
+    *,
+    status: str,
+    featured_image_id: Optional[int],
+    merged_terms: dict,
+    lang_code: Optional[str],
+    translations: Optional[dict[str, int]],
+    tally: Optional[RequestTally],
+    idempotency_key: Optional[str] = None,
+) -> dict:
+    payload = {
+        "title": title,
+        "content": content,
+        "status": status,
+    }
+    if idempotency_key:
+        payload["meta"] = {IDEMPOTENCY_META_KEY: idempotency_key}
+
+    if featured_image_id:
+        payload["featured_media"] = int(featured_image_id)
+
+    # --- Tags and categories (names and/or IDs) ---
+    for taxonomy, merged in merged_terms.items():
+        resolved_ids = resolve_terms(merged, taxonomy=taxonomy, tally=tally)
+        if resolved_ids:
+            payload[taxonomy] = resolved_ids
+
+    # --- Polylang: language and sibling links at create time ---
+    if lang_code:
+        payload["lang"] = lang_code
+    links = _translation_map(translations)
+    if links:
+        payload["translations"] = links
+    return payload
+
+
+def _translation_map(translations: Optional[dict]) -> dict[str, int]:
+    if not translations or not isinstance(translations, dict):
+        return {}
+    return {
+        str(code).strip().lower(): int(sibling_id)
+        for code, sibling_id in translations.items()
+        if sibling_id
+    }
+
+
+_meta_warned = False
+
+
+def _check_meta(data: dict, idempotency_key: Optional[str]) -> None:
+    """Warn once if WordPress dropped the idempotency meta (key not registered for REST)."""
+    global _meta_warned
+    if not idempotency_key or _meta_warned:
+        return
+    if (data.get("meta") or {}).get(IDEMPOTENCY_META_KEY) != idempotency_key:
+        _meta_warned = True
+        logger.warning(
+            "WordPress did not store post meta %r; register it with show_in_rest, "
+            "otherwise retries cannot recognise posts that were already created.",
+            IDEMPOTENCY_META_KEY,
+        )
+
+
+def _after_create(
+    data: dict,
+    lang_code: Optional[str],
+    translations: dict,
+    tally: Optional[RequestTally],
+    idempotency_key: Optional[str] = None,
+) -> dict:
+    """Fix up language / links only when the create response shows they did not stick."""
+    post_id = data.get("id")
+    logger.info("Article posted. Post ID=%s, Link=%s", post_id, data.get("link"))
+    _check_meta(data, idempotency_key)
+
+    # Safety net: Polylang echoes `lang`; only force it when it is missing or wrong
+    if lang_code and data.get("lang") != lang_code:
+        _force_set_language(int(post_id), lang_code, tally)
+
+    linked = data.get("translations") or {}
+    if translations and any(linked.get(code) != sibling for code, sibling in translations.items()):
+        data = link_translations(int(post_id), lang_code, translations, tally) or data
+    return data
+
+
+def link_translations(
+    post_id: int,
+    lang_code: Optional[str],
+    translations: dict[str, int],
+    tally: Optional[RequestTally] = None,
+) -> Optional[dict]:
+    """One POST that links `post_id` with its siblings ({code: post id}); Polylang links the whole group."""
+    try:
+        # Build query params like translations[en]=123
+        link_params = {"lang": lang_code} if lang_code else {}
+        for code, sibling_id in _translation_map(translations).items():
+            link_params[f"translations[{code}]"] = sibling_id
+
+        link_url = f"{WP_POSTS_URL}/{post_id}"
+        link_resp = _wp("POST", link_url, tally, params=link_params, timeout=60)
+        if link_resp.status_code in (200, 201):
+            data = link_resp.json()
+            logger.info("Linked translations for Post ID=%s → %s", post_id, data.get("translations"))
+            return data
+        logger.warning(
+            "Failed to link translations. Status=%s Body=%s",
+            link_resp.status_code, link_resp.text,
+        )
+    except Exception as exc:
+        logger.warning("Exception while linking translations: %s", exc)
+    return None
+
+
 def post_to_wordpress(
     title: str,
     content: str,
@@ -191,51 +436,43 @@ def post_to_wordpress(
     # NEW ↓↓↓
     language: Optional[str] = None,
     translations: Optional[dict[str, int]] = None,
+    idempotency_key: Optional[str] = None,
+    tally: Optional[RequestTally] = None,
 ) -> Optional[dict]:
     """
     Create a WordPress post.
 
+    `idempotency_key` is stored in post meta (IDEMPOTENCY_META_KEY); the outbox
+    passes one per post so it can find a post that an interrupted attempt
+    created (see find_posts_by_key()).
+
     Polylang:
       - If `language` is provided (e.g. "DE", "de"), and Polylang REST is available,
-        the post is created with that language via the `lang` query param.
+        the post is created with that language (`lang` query param and body field).
+        A separate language POST is only sent if the response shows another language.
       - If `translations` is provided as a mapping { "en": 123, "de": 456, ... },
-        we PATCH the created post with `translations[...]` params to link siblings.
+        it is sent with the create request; a separate linking POST is only made
+        when the response does not show the links.
         (Requires Polylang REST features; if unavailable, we log a warning.)
 
     Returns the created post JSON dict on success, otherwise None.
     """
-    payload = {
-        "title": title,
-        "content": content,
-        "status": status,
-    }
-
-    if featured_image_id:
-        payload["featured_media"] = int(featured_image_id)
-
-    # --- Tags (names and/or IDs) ---
-    merged_tags: List[Union[str, int]] = []
-    if tags:
-        merged_tags.extend(tags)
-    if tag_ids:
-        merged_tags.extend(tag_ids)
-    resolved_tag_ids = resolve_terms(merged_tags, taxonomy="tags")
-    if resolved_tag_ids:
-        payload["tags"] = resolved_tag_ids
-
-    # --- Categories (names and/or IDs) ---
-    merged_cats: List[Union[str, int]] = []
-    if categories:
-        merged_cats.extend(categories)
-    if category_ids:
-        merged_cats.extend(category_ids)
-    resolved_cat_ids = resolve_terms(merged_cats, taxonomy="categories")
-    if resolved_cat_ids:
-        payload["categories"] = resolved_cat_ids
+    merged_terms = _merge_terms(tags, tag_ids, categories, category_ids)
+    lang_code = _normalize_lang_code(language)
+    links = _translation_map(translations)
+    payload = _build_payload(
+        title, content,
+        status=status,
+        featured_image_id=featured_image_id,
+        merged_terms=merged_terms,
+        lang_code=lang_code,
+        translations=links,
+        tally=tally,
+        idempotency_key=idempotency_key,
+    )
 
     # --- Build URL (optionally with Polylang language) ---
     url = WP_POSTS_URL
-    lang_code = _normalize_lang_code(language)
     params = {}
     if lang_code:
         # Always try to set language on create
@@ -243,50 +480,217 @@ def post_to_wordpress(
 
     # --- Create the post ---
     try:
-        resp = requests.post(url, auth=auth, json=payload, params=params or None, timeout=60)
+        resp = _wp("POST", url, tally, json=payload, params=params or None, timeout=60)
+        rejected = _rejected_taxonomies(resp)
+        if rejected:
+            # A cached term no longer exists in WordPress: re-sync and retry once
+            logger.warning("WordPress rejected cached %s; refreshing taxonomy cache.", ", ".join(rejected))
+            for taxonomy in rejected:
+                taxonomy_cache.invalidate(WP_API_BASE, taxonomy)
+                payload[taxonomy] = resolve_terms(merged_terms[taxonomy], taxonomy=taxonomy, tally=tally)
+            resp = _wp("POST", url, tally, json=payload, params=params or None, timeout=60)
     except Exception as exc:
         logger.exception("Post creation request failed: %s", exc)
         return None
 
     if resp.status_code != 201:
         logger.error("Failed to create post. Status=%s, Body=%s", resp.status_code, resp.text)
-        if lang_code and not pll_ok:
+        if lang_code and not _polylang_rest_available():
             logger.warning(
                 "Note: Polylang REST not detected; cannot assign language via API. "
                 "Post created without explicit Polylang language."
             )
         return None
 
-    data = resp.json()
-    post_id = data.get("id")
-    logger.info("Article posted. Post ID=%s, Link=%s", post_id, data.get("link"))
-    # Safety net: if a language was requested, force-set it post-creation
-    if lang_code:
-        _force_set_language(int(post_id), lang_code)
+    return _after_create(resp.json(), lang_code, links, tally, idempotency_key)
+
 
-    # --- Link translations (optional) ---
+def _batch_rejected(resp) -> bool:
+    """True if WordPress refused the batch call itself, before creating anything."""
+    if resp.status_code in (400, 404):
+        return True
+    try:
+        return (resp.json() or {}).get("code") == "rest_no_route"
+    except ValueError:
+        return False
 
-    if translations and isinstance(translations, dict):
+
+def find_posts_by_key(
+    keys: Iterable[str],
+    since: Optional[float] = None,
+    tally: Optional[RequestTally] = None,
+) -> dict[str, dict]:
+    """
+    Return {idempotency key: post} for posts (any status, any language) whose
+    IDEMPOTENCY_META_KEY is one of `keys`. Core REST cannot filter by meta, so
+    this pages through posts newest first, from `since` (epoch seconds; a day
+    of slack covers server time zones) or at most LOOKUP_MAX_PAGES pages.
+    Raises on transport/HTTP errors so callers never mistake "unknown" for "absent".
+    """
+    wanted = set(keys)
+    found: dict[str, dict] = {}
+    params = {
+        "status": "publish,future,draft,pending,private",
+        "context": "edit",
+        "lang": "",  # Polylang: every language, not just the default one
+        "orderby": "modified",
+        "order": "desc",
+        "per_page": TERMS_PER_PAGE,
+        "_fields": "id,link,lang,meta",
+    }
+    if since is not None:
+        params["modified_after"] = datetime.fromtimestamp(since - 24 * 3600, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    for page in range(1, LOOKUP_MAX_PAGES + 1):
+        resp = _wp("GET", WP_POSTS_URL, tally, params={**params, "page": page}, timeout=30)
+        if resp.status_code == 400 and page > 1:
+            break  # rest_post_invalid_page_number: past the last page
+        resp.raise_for_status()
+        batch = resp.json() or []
+        for post in batch:
+            key = (post.get("meta") or {}).get(IDEMPOTENCY_META_KEY)
+            if key in wanted:
+                found.setdefault(key, post)
+        if len(found) == len(wanted) or len(batch) < TERMS_PER_PAGE:
+            break
+    return found
+
+
+def _create_batch(posts: List[dict], tally: RequestTally) -> Optional[List[Optional[dict]]]:
+    """
+    Create several posts through /batch/v1 (BATCH_LIMIT per call).
+    Returns one created-post dict (or None) per input, or None if WordPress
+    rejected the batch endpoint up front and the caller should fall back.
+    """
+    results: List[Optional[dict]] = []
+    batch_url = f"{WP_DOMAIN.rstrip('/')}/wp-json/batch/v1"
+    api_path = WP_API_BASE.split("/wp-json", 1)[1]  # "/wp/v2"
+
+    for start in range(0, len(posts), BATCH_LIMIT):
+        chunk = posts[start:start + BATCH_LIMIT]
+        requests_ = [
+            {
+                "method": "POST",
+                "path": f"{api_path}/posts" + (f"?lang={p['lang']}" if p.get("lang") else ""),
+                "body": p,
+            }
+            for p in chunk
+        ]
         try:
-            # Build query params like translations[en]=123
-            link_params = {"lang": lang_code} if lang_code else {}
-            for code, sibling_id in translations.items():
-                if not sibling_id:
-                    continue
-                key = f"translations[{str(code).strip().lower()}]"
-                link_params[key] = int(sibling_id)
-
-            link_url = f"{WP_POSTS_URL}/{post_id}"
-            link_resp = requests.post(link_url, auth=auth, params=link_params, timeout=60)
-            if link_resp.status_code in (200, 201):
-                data = link_resp.json()
-                logger.info("Linked translations for Post ID=%s → %s", post_id, data.get("translations"))
-            else:
-                logger.warning(
-                    "Failed to link translations. Status=%s Body=%s",
-                    link_resp.status_code, link_resp.text,
-                )
+            resp = _wp("POST", batch_url, tally, json={"requests": requests_}, timeout=120)
         except Exception as exc:
-            logger.warning("Exception while linking translations: %s", exc)
+            resp = None
+            logger.warning("Batch create failed: %s", exc)
+        if resp is None or resp.status_code not in (200, 207):
+            if not results and resp is not None and _batch_rejected(resp):
+                logger.warning("Batch endpoint unusable; falling back to single requests.")
+                return None
+            # A timeout or 5xx may still have been applied server-side: report the
+            # rest as failed (the outbox retries them) rather than risk duplicates
+            logger.error("Batch create outcome unknown; %d post(s) left for a retry.", len(posts) - len(results))
+            return results + [None] * (len(posts) - len(results))
+
+        for item in (resp.json() or {}).get("responses", []):
+            if item.get("status") == 201:
+                results.append(item.get("body"))
+            else:
+                logger.error("Batch item failed. Status=%s, Body=%s", item.get("status"), item.get("body"))
+                results.append(None)
+    return results
 
-    return data
+
+def publish_post_group(
+    base: dict,
+    siblings: List[dict],
+    *,
+    max_workers: int = 4,
+    already_posted: Optional[dict[str, dict]] = None,
+    on_created: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """
+    Publish a base post and its translations with as few WordPress requests as possible.
+
+    `base` and each sibling are post_to_wordpress() keyword arguments (title,
+    content, featured_image_id, tags, categories, language). The base post is
+    created first; siblings are created in one /batch/v1 call when the site
+    supports it, otherwise concurrently. A single linking POST on the base post
+    then joins the whole group in Polylang.
+
+    Languages in `already_posted` ({code: post dict} from an earlier attempt)
+    are not created again; `on_created(code, post)` is called as soon as each
+    new post exists, so callers can persist progress.
+
+    Returns {"posts": {language code: created post dict or None}, "requests": n}.
+    """
+    tally = RequestTally()
+    done = dict(already_posted or {})
+    base_code = _normalize_lang_code(base.get("language")) or "en"
+
+    def _created(code: Optional[str], data: Optional[dict]) -> Optional[dict]:
+        if data is not None and code and on_created is not None:
+            on_created(code, data)
+        return data
+
+    if base_code in done:
+        posts: dict[str, Optional[dict]] = {base_code: done[base_code]}
+    else:
+        posts = {base_code: _created(base_code, post_to_wordpress(**base, tally=tally))}
+    if posts[base_code] is None:
+        logger.error("Base post failed; siblings not published.")
+        return {"posts": posts, "requests": tally.count}
+
+    posts.update({code: data for code, data in done.items() if code != base_code})
+    siblings = [s for s in siblings if _normalize_lang_code(s.get("language")) not in done]
+
+    created = None
+    if len(siblings) > 1 and _batch_available():
+        payloads = [
+            _build_payload(
+                s["title"], s["content"],
+                status=s.get("status", "publish"),
+                featured_image_id=s.get("featured_image_id"),
+                merged_terms=_merge_terms(
+                    s.get("tags"), s.get("tag_ids"), s.get("categories"), s.get("category_ids")
+                ),
+                lang_code=_normalize_lang_code(s.get("language")),
+                translations=None,
+                tally=tally,
+                idempotency_key=s.get("idempotency_key"),
+            )
+            for s in siblings
+        ]
+        created = _create_batch(payloads, tally)
+        if created is not None:
+            created = [
+                _created(p.get("lang"), _after_create(
+                    data, p.get("lang"), {}, tally, (p.get("meta") or {}).get(IDEMPOTENCY_META_KEY)
+                )) if data else None
+                for data, p in zip(created, payloads)
+            ]
+
+    if created is None:
+        def _post(sibling: dict) -> Optional[dict]:
+            return _created(
+                _normalize_lang_code(sibling.get("language")),
+                post_to_wordpress(**sibling, tally=tally),
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(siblings) or 1)), thread_name_prefix="wp") as pool:
+            created = list(pool.map(_post, siblings))
+
+    for sibling, data in zip(siblings, created):
+        code = _normalize_lang_code(sibling.get("language"))
+        if data is None:
+            logger.error("Failed to post %s translation.", (code or "?").upper())
+        posts[code] = data
+
+    # One final pass links every published sibling to the base post
+    ids = {code: int(data["id"]) for code, data in posts.items() if data and code}
+    if len(ids) > 1:
+        link_translations(ids[base_code], base_code, ids, tally)
+
+    published = sum(1 for data in posts.values() if data)
+    logger.info(
+        "Published %d/%d posts in %d WordPress requests (%.1f per post).",
+        published, len(posts), tally.count, tally.count / max(1, published),
+    )
+    return {"posts": posts, "requests": tally.count}
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.logger import logger
+
+# === Setup ===
+base_dir = Path(__file__).resolve().parent.parent  # project root
+dotenv_path = os.path.join(base_dir, ".env")
+load_dotenv(dotenv_path)
+
+# === Defaults ===
+# (requests per minute, calls in flight); 0 = unlimited. Override with e.g.
+# OPENAI_RPM / OPENAI_CONCURRENCY, SERPAPI_RPM / SERPAPI_CONCURRENCY, WORDPRESS_RPM / ...
+DEFAULT_LIMITS = {
+    "openai": (300, 8),
+    "serpapi": (30, 2),
+    "wordpress": (120, 4),
+}
+
+
+class Budget:
+    """
+    Shared limit for one external service, used as a context manager around
+    each request: at most `concurrency` requests in flight, and request starts
+    spaced so no more than `per_minute` begin in any minute. Every topic
+    worker draws from the same budget, so running topics in parallel does not
+    multiply the load on the service.
+    """
+
+    def __init__(self, name: str, per_minute: float = 0, concurrency: int = 0):
+        self.name = name
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency > 0 else None
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self.calls = 0
+        self.waited = 0.0
+
+    def _reserve(self) -> float:
+        """Claim the next start time; returns how long the caller must sleep."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+            self.calls += 1
+            return start - now
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (e.g. after the service answered 429)."""
+        with self._lock:
+            self._next_start = max(self._next_start, time.monotonic() + seconds)
+
+    def __enter__(self) -> "Budget":
+        started = time.monotonic()
+        if self._slots is not None:
+            self._slots.acquire()
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.waited += time.monotonic() - started
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+
+_budgets: Dict[str, Budget] = {}
+_budgets_lock = threading.Lock()
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"[rate_limit] Ignoring non-numeric {name}={raw!r}")
+        return default
+
+
+def limit(service: str) -> Budget:
+    """Process-wide budget for `service` ('openai', 'serpapi', 'wordpress', ...)."""
+    key = service.lower()
+    budget: Optional[Budget] = _budgets.get(key)
+    if budget is None:
+        with _budgets_lock:
+            budget = _budgets.get(key)
+            if budget is None:
+                rpm, concurrency = DEFAULT_LIMITS.get(key, (0, 0))
+                prefix = key.upper()
+                budget = Budget(
+                    key,
+                    per_minute=_env_number(f"{prefix}_RPM", rpm),
+                    concurrency=int(_env_number(f"{prefix}_CONCURRENCY", concurrency)),
+                )
+                _budgets[key] = budget
+    return budget
+
+
+def log_stats() -> None:
+    """Write one line per service with request count and time spent waiting for the budget."""
+    for name, budget in sorted(_budgets.items()):
+        logger.info(
+            f"[rate_limit] {name}: {budget.calls} requests, "
+            f"{budget.waited:.1f} s total waiting for budget"
+        )
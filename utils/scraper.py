@@ -3,12 +3,13 @@ import pandas as pd
 from pathlib import Path
 import os
 from urllib.parse import urlparse
-from utils.db_utils import insert_article, to_sql_datetime
-import requests
+from utils.db_utils import insert_articles, find_known_articles, to_sql_datetime
 from newspaper import Article, Config, build
 import feedparser
-import time
 from bs4 import BeautifulSoup
+from utils.fetcher import fetch_concurrently
+from utils import http_client, rate_limit
+from utils.http_cache import cached_get, get_meta, is_fresh, set_meta
 from utils.logger import logger
 
 # === Paths ===
@@ -31,8 +32,10 @@ def get_article(url):
     config.request_timeout = 10
 
     try:
+        # Pages fetched on earlier runs are served from the on-disk cache
+        page = cached_get(url, timeout=config.request_timeout)
         article = Article(url, config=config)
-        article.download()
+        article.download(input_html=page.text)
         article.parse()
         result = {
             "url": article.url,
@@ -40,7 +43,6 @@ def get_article(url):
             "text": article.text,
             "publish_date": article.publish_date,
         }
-        time.sleep(4)  # polite delay
         return result
     except Exception as e:
         logger.info(f"Failed to fetch article: {url}")
@@ -76,7 +78,8 @@ def serpapi_search(topic, num_results=5):
         "api_key": serp_api_key
     }
 
-    response = requests.get(url, params=params)
+    with rate_limit.limit("serpapi"):  # shared by every topic worker
+        response = http_client.get(url, params=params)
     response.raise_for_status()
     data = response.json()
 
@@ -105,21 +108,37 @@ def research(query, topic, results=5):
         raise ValueError("query must be a non-empty string.")
 
     research_list = []
+    fresh = []
     counter = 0
     blocked = ["finance.yahoo.com", "bloomberg.com"]
 
     try:
         # FIX: call SerpApi with the actual search query, not topic
         search_results = serpapi_search(query, results) or []
+        search_results = [
+            x for x in search_results
+            if x.get("link") and not any(bad in x["link"].lower() for bad in blocked)
+        ]
 
+        # Serve already-ingested links from the DB instead of downloading them
+        known = find_known_articles([x["link"].lower() for x in search_results])
         for x in search_results:
-            url = (x.get("link") or "").lower()
-            if any(bad in url for bad in blocked):
-                continue
-
-            art = get_article(x["link"])
+            if x["link"].lower() in known:
+                research_list.append(known[x["link"].lower()])
+        search_results = [x for x in search_results if x["link"].lower() not in known]
+        if known:
+            logger.info(f"research(): skipped {len(known)} downloads of known articles")
+
+        # Download concurrently; the fetcher keeps a polite delay per host
+        fetched = fetch_concurrently(
+            search_results, lambda x: get_article(x["link"]), lambda x: x["link"],
+            domain_delay=4, cached_fn=lambda x: is_fresh(x["link"]),
+        )
+
+        for x, art in zip(search_results, fetched):
             if art is None:
                 continue
+            url = x["link"].lower()
 
             my_article = {
                 "title": art["title"],
@@ -131,9 +150,10 @@ def research(query, topic, results=5):
                 "dt_published": to_sql_datetime(art["publish_date"]),
             }
             research_list.append(my_article)
-            response = insert_article(my_article)
-            if response == 200:
-                counter += 1
+            fresh.append(my_article)
+
+        # One transaction for the whole source
+        counter = insert_articles(fresh).count(200)
 
     except Exception as e:
         logger.info(f"Error in research(): {e}")
@@ -145,9 +165,34 @@ def scrapeRSS(url, topic, max_articles=10):
     logger.info(f"Scraping RSS: {url}")
     counter = 0
     research_list = []
+    fresh = []
+
+    # Revalidate with ETag/Last-Modified; an unchanged feed costs a 304 and no parse
+    try:
+        page = cached_get(url, revalidate=True)
+    except Exception as e:
+        logger.info(f"scrapeRSS(): failed to fetch feed {url}: {e}")
+        return research_list
+
+    if page.not_modified:
+        links = (get_meta(url) or {}).get("links", [])
+        known = find_known_articles(links)
+        research_list = [known[link] for link in dict.fromkeys(links) if link in known]  # feed order
+        logger.info(f"Feed unchanged (304); serving {len(research_list)} known entries from DB")
+        return research_list
+
+    feed = feedparser.parse(page.content)
+    entries = feed.entries[:max_articles]
+    set_meta(url, {"links": [entry.get("link") for entry in entries]})  # ordered as in the feed
+    known = find_known_articles([entry.get("link") for entry in entries])
+    if known:
+        logger.info(f"scrapeRSS(): {len(known)} entries already ingested, skipping insert")
+
+    for entry in entries:
+        if entry.get("link") in known:
+            research_list.append(known[entry.link])
+            continue
 
-    feed = feedparser.parse(url)
-    for entry in feed.entries[:max_articles]:
         entry_content = entry.get("summary", "")
         try:
             entry_content = convert_HTML(entry_content)
@@ -164,14 +209,23 @@ def scrapeRSS(url, topic, max_articles=10):
             "dt_published": to_sql_datetime(entry.get("published", ""))
         }
         research_list.append(article)
-        response = insert_article(article)
-        if response == 200:
-            counter += 1
+        fresh.append(article)
+
+    # One transaction for the whole feed
+    counter = insert_articles(fresh).count(200)
 
     logger.info(f"Found {counter} new articles")
     return research_list
 
 
+def _download_parse(article):
+    """Download (via the page cache) and parse a newspaper Article in place."""
+    page = cached_get(article.url, timeout=article.config.request_timeout)
+    article.download(input_html=page.text)
+    article.parse()
+    return article
+
+
 def fetchNews(source):
     """
     Build a newspaper source and fetch its articles.
@@ -179,6 +233,7 @@ def fetchNews(source):
     name_name = source["desc_name"]
     logger.info(f"Fetching News from {name_name}")
     research_list = []
+    fresh = []
     config = Config()
     config.browser_user_agent = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -190,10 +245,24 @@ def fetchNews(source):
     try:
         paper = build(source['desc_payload'], config=config, memoize_articles=False)
 
-        for article in paper.articles[:50]:
+        candidates = paper.articles[:50]
+
+        # Serve already-ingested links from the DB instead of downloading them
+        known = find_known_articles([a.url for a in candidates])
+        research_list.extend(known[a.url] for a in candidates if a.url in known)
+        candidates = [a for a in candidates if a.url not in known]
+        if known:
+            logger.info(f"fetchNews() - skipped {len(known)} downloads of known articles")
+
+        parsed = fetch_concurrently(
+            candidates, _download_parse, lambda a: a.url, domain_delay=1,
+            cached_fn=lambda a: is_fresh(a.url),
+        )
+
+        for article in parsed:
+            if article is None:
+                continue
             try:
-                article.download()
-                article.parse()
                 article_local = {
                     "title": article.title,
                     "content": article.text,
@@ -204,13 +273,12 @@ def fetchNews(source):
                     "dt_published": to_sql_datetime(article.publish_date),
                 }
                 research_list.append(article_local)
-                response = insert_article(article_local)
-                if response == 200:
-                    counter += 1
-                time.sleep(1)
+                fresh.append(article_local)
             except Exception as e:
                 logger.info(f"fetchNews() - Failed parsing article: {e}")
-                time.sleep(1)
+
+        # One transaction for the whole source
+        counter = insert_articles(fresh).count(200)
 
     except Exception as e:
         logger.info(f"fetchNews() - Failed to build source: {source['desc_name']}")
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.logger import logger
+
+# --- Paths ---
+BASE_DIR: Path = Path(__file__).resolve().parent.parent  # project root
+PHRASES_DIR: Path = BASE_DIR / "prompts" / "banned_phrases"  # <language>[.flag].txt, one phrase per line
+
+_NEVER = "(?!x)x"  # matches nothing
+
+
+def build_trie_pattern(phrases: Sequence[str]) -> str:
+    """
+    Regex alternation for many literal phrases, factored as a character trie
+    so the engine walks shared prefixes once instead of trying every phrase.
+    Whitespace inside a phrase matches any run of whitespace.
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in " ".join(phrase.lower().split()):
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of phrase
+
+    def _emit(node: dict) -> str:
+        optional = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            atom = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(atom + _emit(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            body = "(?:" + body + ")?"  # greedy: the longest phrase wins, shorter on backtrack
+        return body
+
+    if not trie:
+        return _NEVER
+    return _emit(trie)
+
+
+def load_phrases(path: Path) -> List[str]:
+    """Non-empty, non-comment lines of a phrase file (deduplicated, lowercased)."""
+    phrases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                phrases.append(" ".join(line.lower().split()))
+    return list(dict.fromkeys(phrases))
+
+
+def _starts_sentence(text: str, index: int) -> bool:
+    """True if `index` is at the start of a sentence, line or HTML block."""
+    before = text[:index].rstrip(" \t")
+    if not before or before[-1] in ".!?:\n>":
+        return True
+    return before[-1] in "\"'”’)" and len(before) > 1 and before[-2] in ".!?"
+
+
+class PhraseMatcher:
+    """
+    One compiled, case-insensitive regex for a phrase file plus optional
+    built-in regex patterns. The file is re-read lazily when its mtime changes.
+
+    With sentence_initial=True, scrub() only removes phrases that open a
+    sentence (lead-ins such as "It is worth noting that"), together with a
+    following comma, and capitalizes what now starts the sentence; the same
+    words inside a sentence are left alone.
+    """
+
+    def __init__(self, path: Path, patterns: Sequence[str] = (), sentence_initial: bool = False):
+        self.path = Path(path)
+        self.patterns = tuple(patterns)
+        self.sentence_initial = sentence_initial
+        self.phrase_count = 0
+        self._mtime: Optional[float] = -1.0
+        self._regex: Optional[re.Pattern] = None
+        self._lock = threading.Lock()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def regex(self) -> re.Pattern:
+        mtime = self._current_mtime()
+        if self._regex is not None and mtime == self._mtime:
+            return self._regex
+        with self._lock:
+            if self._regex is None or mtime != self._mtime:
+                phrases = []
+                if mtime is not None:
+                    try:
+                        phrases = load_phrases(self.path)
+                    except OSError as e:
+                        logger.warning(f"[scrubber] Could not read {self.path}: {e}")
+                alternatives = list(self.patterns)
+                if phrases:
+                    # (?!\w) rather than \b so entries may end in punctuation ("looking ahead,")
+                    tail = r"(?:[ \t]*,)?[ \t]*" if self.sentence_initial else ""
+                    alternatives.append(r"\b" + build_trie_pattern(phrases) + r"(?!\w)" + tail)
+                self._regex = re.compile("|".join(alternatives) or _NEVER, re.IGNORECASE)
+                self._mtime = mtime
+                self.phrase_count = len(phrases)
+                logger.info(f"[scrubber] Compiled {len(phrases)} phrases from {self.path.name}")
+        return self._regex
+
+    def find(self, text: str) -> List[str]:
+        """Every match in `text`, lowercased, in order of appearance."""
+        return [" ".join(m.group(0).lower().split()) for m in self.regex().finditer(text)]
+
+    def scrub(self, text: str) -> Tuple[str, List[str]]:
+        """Remove all matches in one pass. Returns (cleaned text, removed phrases)."""
+        matches: List[str] = []
+        out: List[str] = []
+        pos = 0
+        capitalize = False
+        for m in self.regex().finditer(text):
+            opens_sentence = _starts_sentence(text, m.start())
+            if self.sentence_initial and not opens_sentence:
+                continue
+            piece = text[pos:m.start()]
+            if capitalize and piece.strip():
+                piece = _capitalize_first(piece)
+                capitalize = False
+            out.append(piece)
+            matches.append(" ".join(m.group(0).lower().strip(" \t,").split()))
+            capitalize = capitalize or (self.sentence_initial and opens_sentence)
+            pos = m.end()
+        rest = text[pos:]
+        out.append(_capitalize_first(rest) if capitalize else rest)
+        return "".join(out), matches
+
+
+def _capitalize_first(text: str) -> str:
+    """Upper-case the first letter of `text` (leading spaces and markup are skipped)."""
+    m = re.search(r"[^\W\d_]", text)
+    return text if m is None else text[:m.start()] + m.group(0).upper() + text[m.end():]
+
+
+_matchers: Dict[Tuple[str, Tuple[str, ...], bool], PhraseMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_matcher(language: str = "en", patterns: Sequence[str] = (), flags: bool = False) -> PhraseMatcher:
+    """
+    Shared matcher for prompts/banned_phrases/<language>.txt (sentence-initial
+    lead-ins, safe to delete) or, with flags=True, <language>.flag.txt (stock
+    phrases that are only reported), plus `patterns`.
+    """
+    key = (language.lower(), tuple(patterns), flags)
+    with _matchers_lock:
+        if key not in _matchers:
+            name = f"{key[0]}.flag.txt" if flags else f"{key[0]}.txt"
+            _matchers[key] = PhraseMatcher(PHRASES_DIR / name, patterns, sentence_initial=not flags)
+        return _matchers[key]
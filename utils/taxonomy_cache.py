@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import html
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from utils.db_utils import db_session
+from utils.logger import logger
+
+# --- Paths ---
+BASE_DIR: Path = Path(__file__).resolve().parent.parent  # project root
+ASSETS_DIR: Path = BASE_DIR / "assets"
+CACHE_PATH: Path = ASSETS_DIR / "taxonomy_cache.db"
+
+# --- Limits ---
+SYNC_TTL = 24 * 3600  # full re-download of a taxonomy after a day
+
+_lock = threading.Lock()  # guards _memory
+_memory: Dict[tuple, Dict[str, int]] = {}  # (site, taxonomy) -> {name key: term id}
+
+
+def name_key(name: str) -> str:
+    """WordPress returns names HTML-escaped ("Oil &amp; Gas"); compare unescaped, case-folded."""
+    return " ".join(html.unescape(str(name)).split()).lower()
+
+
+def _migration_1(conn: sqlite3.Connection) -> None:
+    """Term IDs per site/taxonomy plus the time of the last full sync."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS terms (
+            site TEXT,
+            taxonomy TEXT,
+            name_key TEXT,
+            term_id INTEGER,
+            name TEXT,
+            PRIMARY KEY (site, taxonomy, name_key)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS taxonomy_sync (
+            site TEXT,
+            taxonomy TEXT,
+            synced_at REAL,
+            PRIMARY KEY (site, taxonomy)
+        )
+    """)
+
+
+# Schema of taxonomy_cache.db, applied by utils.db_utils on first connection
+MIGRATIONS = (
+    _migration_1,
+)
+
+
+def _load(site: str, taxonomy: str) -> Dict[str, int]:
+    """In-memory map for a taxonomy, read from disk on first use. Caller holds _lock."""
+    key = (site, taxonomy)
+    if key not in _memory:
+        with db_session(CACHE_PATH, MIGRATIONS) as conn:
+            rows = conn.execute(
+                "SELECT name_key, term_id FROM terms WHERE site = ? AND taxonomy = ?", (site, taxonomy)
+            ).fetchall()
+        _memory[key] = {k: int(i) for k, i in rows}
+    return _memory[key]
+
+
+def is_stale(site: str, taxonomy: str, ttl: float = SYNC_TTL) -> bool:
+    """True if the taxonomy was never synced, or was synced more than `ttl` seconds ago."""
+    with db_session(CACHE_PATH, MIGRATIONS) as conn:
+        row = conn.execute(
+            "SELECT synced_at FROM taxonomy_sync WHERE site = ? AND taxonomy = ?", (site, taxonomy)
+        ).fetchone()
+    return row is None or time.time() - row[0] > ttl
+
+
+def lookup(site: str, taxonomy: str, name: str) -> Optional[int]:
+    """Term ID for `name`, or None if it is not in the cache."""
+    with _lock:
+        return _load(site, taxonomy).get(name_key(name))
+
+
+def replace_all(site: str, taxonomy: str, terms: Iterable[dict]) -> int:
+    """Replace the cached taxonomy with a full listing ([{id, name}, ...]) and mark it synced."""
+    rows = {name_key(t["name"]): (int(t["id"]), str(t["name"])) for t in terms if t.get("name")}
+    with _lock:
+        with db_session(CACHE_PATH, MIGRATIONS) as conn:
+            conn.execute("DELETE FROM terms WHERE site = ? AND taxonomy = ?", (site, taxonomy))
+            conn.executemany(
+                "INSERT INTO terms (site, taxonomy, name_key, term_id, name) VALUES (?, ?, ?, ?, ?)",
+                [(site, taxonomy, k, term_id, name) for k, (term_id, name) in rows.items()],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO taxonomy_sync (site, taxonomy, synced_at) VALUES (?, ?, ?)",
+                (site, taxonomy, time.time()),
+            )
+        _memory[(site, taxonomy)] = {k: term_id for k, (term_id, _) in rows.items()}
+    logger.info(f"[taxonomy_cache] Cached {len(rows)} {taxonomy}")
+    return len(rows)
+
+
+def add(site: str, taxonomy: str, name: str, term_id: int) -> None:
+    """Remember one term (e.g. right after creating it)."""
+    key = name_key(name)
+    with _lock:
+        with db_session(CACHE_PATH, MIGRATIONS) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO terms (site, taxonomy, name_key, term_id, name) VALUES (?, ?, ?, ?, ?)",
+                (site, taxonomy, key, int(term_id), name),
+            )
+        _load(site, taxonomy)[key] = int(term_id)
+
+
+def invalidate(site: str, taxonomy: str) -> None:
+    """Forget a taxonomy so the next lookup triggers a full re-sync (e.g. a term was deleted in WP)."""
+    with _lock:
+        with db_session(CACHE_PATH, MIGRATIONS) as conn:
+            conn.execute("DELETE FROM terms WHERE site = ? AND taxonomy = ?", (site, taxonomy))
+            conn.execute("DELETE FROM taxonomy_sync WHERE site = ? AND taxonomy = ?", (site, taxonomy))
+        _memory.pop((site, taxonomy), None)
+    logger.info(f"[taxonomy_cache] Invalidated {taxonomy}")
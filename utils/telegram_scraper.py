@@ -3,6 +3,7 @@ from telethon import TelegramClient
 import asyncio
 from dotenv import load_dotenv
 import os
+from utils.db_utils import insert_articles, find_known_articles, to_sql_datetime
 from utils.logger import logger
 
 # Load environment variables
@@ -47,26 +48,39 @@ async def _get_latest_messages(channel_username, limit=10):
 
 # --- Public function ---
 def fetchTelegram(source):
-    telegram_channel = source["payload"].replace("https://t.me/", "")
+    telegram_channel = source["desc_payload"].replace("https://t.me/", "")
 
     # Run async function in a blocking way (main.py can just call fetchTelegram normally)
     messages = asyncio.run(_get_latest_messages(telegram_channel, limit=source["limit"]))
 
+    known = find_known_articles([f"{source['desc_payload']}/{msg['id']}" for msg in messages])
+    if known:
+        logger.info(f"fetchTelegram(): {len(known)} messages already ingested, skipping insert")
+
     tmp_db = []
+    fresh = []
     for msg in messages:
+        link = f"{source['desc_payload']}/{msg['id']}"
+        if link in known:
+            tmp_db.append(known[link])
+            continue
+
         article = {
             "title": str(msg["id"]),
             "content": msg["text"],
             "channel": "Telegram",
             "source": source["desc_name"],
             "topic": source["desc_topic_primary"],
-            "link": f"{source['desc_payload']}/{msg['id']}",
+            "link": link,
             "dt_published": to_sql_datetime(msg["date"])
         }
         tmp_db.append(article)
+        fresh.append(article)
 
-        response = insert_article(article)
-        if response == 200:
-            logger.info(f"✅ Inserted article {msg['id']} from {source['name']}")
+    # One transaction for the whole channel
+    statuses = insert_articles(fresh)
+    for article, status in zip(fresh, statuses):
+        if status == 200:
+            logger.info(f"✅ Inserted article {article['title']} from {source['desc_name']}")
 
     return tmp_db
@@ -1,12 +1,32 @@
 from __future__ import annotations
 from utils.logger  import logger
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Literal, Optional
-from openai import OpenAI
+from typing import Literal, Optional, Sequence
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from utils import llm
+from utils.db_utils import db_session
+from prompts.prompter import count_tokens
 import pandas as pd
 
 DEFAULT_MODEL = "gpt-4o-mini"
 
+# Max translation requests in flight at once (titles, bodies and chunks alike, process-wide)
+DEFAULT_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "6"))
+_in_flight = threading.BoundedSemaphore(max(1, DEFAULT_CONCURRENCY))
+
+# Long bodies are translated in chunks of at most this many tokens
+DEFAULT_CHUNK_TOKENS = int(os.getenv("TRANSLATION_CHUNK_TOKENS", "800"))
+# Extra attempts for a chunk whose output is empty or truncated. API errors are
+# not retried here: the utils.llm gateway already retries transient failures.
+CHUNK_RETRIES = 1
+MIN_LENGTH_RATIO = 0.3   # output shorter than this share of a long input counts as truncated
+MIN_CHECKED_CHARS = 200  # shorter inputs (titles, one-liners) are not length-checked
+
 # Prompts live in: <repo-root>/prompts/*.txt
 # This module is in: <repo-root>/utils/translator.py
 PROMPTS_DIR = (Path(__file__).resolve().parent.parent / "prompts").resolve()
@@ -17,6 +37,18 @@ PROMPT_FILES: dict[str, str] = {
     "article": "article_translation_system.txt",
 }
 
+# Translation memory: <repo-root>/assets/translation_memory.db
+TM_PATH = (Path(__file__).resolve().parent.parent / "assets" / "translation_memory.db").resolve()
+
+# Paragraphs are separated by a blank line
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+
+# Safe places to cut an oversized paragraph: after a closing block tag or a line break
+BLOCK_BOUNDARY = re.compile(
+    r"(</(?:p|h[1-6]|li|ul|ol|blockquote|div|table|figure)>\s*|<br\s*/?>\s*|\n+)",
+    re.IGNORECASE,
+)
+
 def load_language_config(excel_path: str | Path) -> list[dict]:
     """
     Load language configuration from the 'lang_config' sheet
@@ -82,6 +114,260 @@ def _load_system_prompt(kind: Literal["title", "article"]) -> str:
         logger.error(msg)
         raise FileNotFoundError(msg) from exc
 
+# ==========================
+# Translation memory (SQLite)
+# ==========================
+_tm_stats_lock = threading.Lock()
+_tm_stats = {"hits": 0, "misses": 0}
+
+
+def _tm_migration_1(conn: sqlite3.Connection) -> None:
+    """Translated paragraphs keyed by source hash, language and prompt version."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS translation_memory (
+            segment_hash TEXT NOT NULL,
+            target_language TEXT NOT NULL,
+            prompt_version TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            dt_added TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (segment_hash, target_language, prompt_version)
+        )
+    """)
+
+
+# Schema of translation_memory.db, applied by utils.db_utils on first connection
+TM_MIGRATIONS = (
+    _tm_migration_1,
+)
+
+
+def _segment_hash(segment: str) -> str:
+    return hashlib.sha256(segment.strip().encode("utf-8")).hexdigest()
+
+
+def _prompt_version(system_prompt: str, model: str) -> str:
+    """Changes whenever the system prompt or model does, invalidating old entries."""
+    return hashlib.sha256(f"{model}\n{system_prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+def _tm_lookup(hashes: Sequence[str], target_language: str, version: str) -> dict[str, str]:
+    hashes = list(dict.fromkeys(hashes))
+    if not hashes:
+        return {}
+    found: dict[str, str] = {}
+    try:
+        with db_session(TM_PATH, TM_MIGRATIONS) as conn:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT segment_hash, translation FROM translation_memory "
+                    f"WHERE target_language = ? AND prompt_version = ? "
+                    f"AND segment_hash IN ({placeholders})",
+                    (target_language, version, *chunk),
+                ).fetchall()
+                found.update(rows)
+    except sqlite3.Error as exc:
+        logger.warning("Translation memory lookup failed: %s", exc)
+    return found
+
+
+def _tm_store(entries: dict[str, str], target_language: str, version: str) -> None:
+    if not entries:
+        return
+    try:
+        with db_session(TM_PATH, TM_MIGRATIONS) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translation_memory "
+                "(segment_hash, target_language, prompt_version, translation) VALUES (?, ?, ?, ?)",
+                [(h, target_language, version, t) for h, t in entries.items()],
+            )
+    except sqlite3.Error as exc:
+        logger.warning("Translation memory store failed: %s", exc)
+
+
+def _split_segments(text: str) -> tuple[list[str], list[str]]:
+    """Split into paragraphs; also return the separators between them (len = segments - 1)."""
+    parts = PARAGRAPH_BREAK.split(text)
+    separators = PARAGRAPH_BREAK.findall(text)
+    return parts, separators
+
+
+def get_translation_memory_stats() -> dict[str, float]:
+    """Segments served from / sent past the translation memory in this process."""
+    with _tm_stats_lock:
+        hits, misses = _tm_stats["hits"], _tm_stats["misses"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 3) if total else 0.0}
+
+
+def log_translation_memory_stats() -> None:
+    stats = get_translation_memory_stats()
+    logger.info(
+        "Translation memory: %d segment hits, %d misses (hit ratio %.1f%%)",
+        stats["hits"], stats["misses"], 100 * stats["hit_ratio"],
+    )
+
+
+# ==========================
+# Chunking
+# ==========================
+def _chunk_run(run: tuple[int, int], token_counts: Sequence[int], max_tokens: int) -> list[tuple[int, int]]:
+    """Greedily group the paragraphs of a run into (start, end) chunks of <= max_tokens."""
+    chunks: list[tuple[int, int]] = []
+    start, total = run[0], 0
+    for i in range(run[0], run[1]):
+        if i > start and total + token_counts[i] > max_tokens:
+            chunks.append((start, i))
+            start, total = i, 0
+        total += token_counts[i]
+    chunks.append((start, run[1]))
+    return chunks
+
+
+def _split_block(text: str, max_tokens: int) -> list[str]:
+    """
+    Cut one oversized paragraph after HTML block tags / line breaks into
+    pieces of <= max_tokens where possible. "".join(pieces) == text.
+    """
+    parts = BLOCK_BOUNDARY.split(text)
+    atoms = [parts[i] + (parts[i + 1] if i + 1 < len(parts) else "") for i in range(0, len(parts), 2)]
+
+    pieces: list[str] = []
+    current, current_tokens = "", 0
+    for atom in atoms:
+        tokens = count_tokens(atom)
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(current)
+            current, current_tokens = "", 0
+        current += atom
+        current_tokens += tokens
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+class IncompleteTranslation(RuntimeError):
+    """The model answered, but the output is empty or clearly truncated."""
+
+
+def _translate_with_retries(text: str, target_language: str, kind: str, system_prompt: str, model: str) -> str:
+    """Translate one piece, keeping its trailing whitespace/markup breaks intact."""
+    core = text.rstrip()
+    tail = text[len(core):]
+    if not core:
+        return text
+    for attempt in range(CHUNK_RETRIES + 1):
+        try:
+            return _request_translation(core, target_language, kind, system_prompt, model) + tail
+        except IncompleteTranslation:
+            if attempt == CHUNK_RETRIES:
+                raise
+            logger.warning("Retrying chunk (%s -> %s), attempt %d", kind, target_language, attempt + 2)
+    raise AssertionError("unreachable")
+
+
+def _translate_pieces(
+    pending: dict[tuple[int, int], list[str]],
+    target_language: str,
+    kind: str,
+    system_prompt: str,
+    model: str,
+    max_workers: int,
+) -> tuple[dict[tuple[int, int], str], list[tuple[int, int]]]:
+    """
+    Translate every piece of every chunk concurrently. Requests in flight are
+    capped process-wide by TRANSLATION_CONCURRENCY, however many texts and
+    languages are being translated at once.
+    Returns ({chunk: translated text} for chunks whose pieces all succeeded, [failed chunks]).
+    """
+    if not pending:
+        return {}, []
+
+    jobs = [(chunk, piece) for chunk, pieces in pending.items() for piece in pieces]
+    if len(jobs) == 1:
+        chunk, piece = jobs[0]
+        return {chunk: _translate_with_retries(piece, target_language, kind, system_prompt, model).strip()}, []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))), thread_name_prefix="chunk") as pool:
+        futures = [
+            pool.submit(_translate_with_retries, piece, target_language, kind, system_prompt, model)
+            for _, piece in jobs
+        ]
+
+    outputs: dict[tuple[int, int], list[str]] = {chunk: [] for chunk in pending}
+    failed: list[tuple[int, int]] = []
+    for (chunk, _), future in zip(jobs, futures):
+        if chunk in failed:
+            continue
+        try:
+            outputs[chunk].append(future.result())
+        except Exception as exc:
+            logger.error("Chunk %s (%s -> %s) failed: %s", chunk, kind, target_language, exc)
+            failed.append(chunk)
+
+    translated = {chunk: "".join(parts).strip() for chunk, parts in outputs.items() if chunk not in failed}
+    if len(pending) > 1:
+        logger.info("Translated %d chunks concurrently (%s -> %s)", len(pending), kind, target_language)
+    return translated, failed
+
+
+# ==========================
+# Translation
+# ==========================
+def _request_translation(
+    text: str,
+    target_language: str,
+    kind: str,
+    system_prompt: str,
+    model: str,
+) -> str:
+    """One model call: translate `text` (English) into `target_language`."""
+    # We instruct the model clearly about direction (always English -> target)
+    user_prompt = (
+        f"Translate the following text from English to {target_language}.\n\n"
+        f"{text}"
+    )
+
+    try:
+        logger.info(
+            "Translating (%s) to %s with model %s. Input chars=%d",
+            kind,
+            target_language,
+            model,
+            len(text),
+        )
+
+        with _in_flight:
+            response = llm.create_response(
+                f"translator.{kind}",
+                model=model,
+                input=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+
+        translated = (response.output_text or "").strip()
+        if not translated:
+            raise IncompleteTranslation("OpenAI returned an empty translation.")
+        if len(text) >= MIN_CHECKED_CHARS and len(translated) < MIN_LENGTH_RATIO * len(text):
+            raise IncompleteTranslation(
+                f"Translation looks truncated ({len(translated)} chars for {len(text)})."
+            )
+        logger.debug(
+            "Translation success (%s): %.60r ...", kind, translated[:60]
+        )
+        return translated
+
+    except IncompleteTranslation as exc:
+        logger.warning("Incomplete translation (%s -> %s): %s", kind, target_language, exc)
+        raise
+    except Exception as exc:  # Broad catch to rewrap with context + logging
+        logger.exception("Translation failed (%s -> %s): %s", kind, target_language, exc)
+        raise RuntimeError(f"Translation failed: {exc}") from exc
+
+
 def translate_text(
     text: str,
     target_language: str,
@@ -89,10 +375,19 @@ def translate_text(
     kind: Literal["title", "article"] = "article",
     system_prompt_override: Optional[str] = None,
     model: str = DEFAULT_MODEL,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    max_workers: int = DEFAULT_CONCURRENCY,
 ) -> str:
     """
     Translate *English* text into `target_language` using the OpenAI API.
 
+    The text is split into paragraphs and each one is looked up in the
+    translation memory (segment hash, target language, prompt version).
+    Unknown paragraphs are grouped into chunks of at most `chunk_tokens`
+    tokens (oversized paragraphs are cut at HTML block boundaries), the
+    chunks are translated concurrently, and everything is reassembled in
+    the original order. Only failed chunks are retried.
+
     Args:
         text: The English source text to translate.
         target_language: The target language (e.g., "Serbian", "French").
@@ -101,6 +396,9 @@ def translate_text(
         system_prompt_override: If provided, use this string instead of loading
               from a file. Useful for one-off/custom behaviors.
         model: OpenAI model name. Defaults to a fast, inexpensive model.
+        chunk_tokens: Token budget per request.
+        max_workers: Max chunk threads for this text (requests in flight are
+              also capped process-wide by TRANSLATION_CONCURRENCY).
 
     Returns:
         The translated text as a plain string.
@@ -121,42 +419,90 @@ def translate_text(
     else:
         system_prompt = _load_system_prompt(kind)
 
-    client = OpenAI()
+    version = _prompt_version(system_prompt, model)
+    segments, separators = _split_segments(text.strip())
+    hashes = [_segment_hash(seg) for seg in segments]
+    memory = _tm_lookup(hashes, target_language, version)
 
-    # We instruct the model clearly about direction (always English -> target)
-    user_prompt = (
-        f"Translate the following text from English to {target_language}.\n\n"
-        f"{text}"
+    # Contiguous runs of paragraphs the memory does not know yet,
+    # cut into token-bounded chunks that are translated concurrently
+    runs: list[tuple[int, int]] = []
+    for i, h in enumerate(hashes):
+        if h in memory:
+            continue
+        if runs and runs[-1][1] == i:
+            runs[-1] = (runs[-1][0], i + 1)
+        else:
+            runs.append((i, i + 1))
+
+    token_counts = [count_tokens(seg) for seg in segments] if runs else []
+    chunks = [chunk for run in runs for chunk in _chunk_run(run, token_counts, chunk_tokens)]
+
+    def _join(start: int, pieces: Sequence[str]) -> str:
+        out = pieces[0]
+        for offset, piece in enumerate(pieces[1:], start=start):
+            out += separators[offset] + piece
+        return out
+
+    # A chunk whose paragraphs could not be matched 1:1 is remembered as a whole
+    chunk_texts = {chunk: _join(chunk[0], segments[chunk[0]:chunk[1]]) for chunk in chunks}
+    memory.update(_tm_lookup(
+        [_segment_hash(t) for (a, b), t in chunk_texts.items() if b - a > 1], target_language, version
+    ))
+
+    blocks: dict[int, tuple[int, str]] = {}  # start -> (end, translated text)
+    for i, h in enumerate(hashes):
+        if h in memory:
+            blocks[i] = (i + 1, memory[h])
+    hits = len(blocks)
+
+    pending: dict[tuple[int, int], list[str]] = {}  # chunk -> pieces to send
+    for chunk, chunk_text in chunk_texts.items():
+        chunk_hash = _segment_hash(chunk_text)
+        if chunk_hash in memory:
+            blocks[chunk[0]] = (chunk[1], memory[chunk_hash])
+            hits += chunk[1] - chunk[0]
+        elif token_counts[chunk[0]] > chunk_tokens:
+            pending[chunk] = _split_block(chunk_text, chunk_tokens)  # one oversized paragraph
+        else:
+            pending[chunk] = [chunk_text]
+
+    translated_chunks, failed = _translate_pieces(
+        pending, target_language, kind, system_prompt, model, max_workers
     )
 
-    try:
+    new_entries: dict[str, str] = {}
+    for (start, end), translated in translated_chunks.items():
+        parts = PARAGRAPH_BREAK.split(translated)
+        if len(parts) == end - start:
+            for offset, part in enumerate(parts):
+                blocks[start + offset] = (start + offset + 1, part)
+                new_entries[hashes[start + offset]] = part
+        else:
+            blocks[start] = (end, translated)
+            new_entries[_segment_hash(chunk_texts[(start, end)])] = translated
+
+    # Keep what succeeded so a retry only re-sends the failed chunks
+    _tm_store(new_entries, target_language, version)
+    with _tm_stats_lock:
+        _tm_stats["hits"] += hits
+        _tm_stats["misses"] += len(segments) - hits
+    if hits:
         logger.info(
-            "Translating (%s) to %s with model %s. Input chars=%d",
-            kind,
-            target_language,
-            model,
-            len(text),
+            "Translation memory (%s -> %s): %d/%d paragraphs reused",
+            kind, target_language, hits, len(segments),
         )
-
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+    if failed:
+        raise RuntimeError(
+            f"Translation failed for {len(failed)} of {len(pending)} chunks ({kind} -> {target_language})"
         )
 
-        translated = (response.output_text or "").strip()
-        if not translated:
-            raise RuntimeError("OpenAI returned an empty translation.")
-        logger.debug(
-            "Translation success (%s): %.60r ...", kind, translated[:60]
-        )
-        return translated
-
-    except Exception as exc:  # Broad catch to rewrap with context + logging
-        logger.exception("Translation failed (%s -> %s): %s", kind, target_language, exc)
-        raise RuntimeError(f"Translation failed: {exc}") from exc
+    # Reassemble in order, restoring the original paragraph separators
+    ordered = sorted(blocks)
+    result = blocks[ordered[0]][1]
+    for start in ordered[1:]:
+        result += separators[start - 1] + blocks[start][1]
+    return result
 
 
 def translate_post_content(title_en: str, body_en: str, lang: str) -> tuple[str, str]:
@@ -169,3 +515,39 @@ def translate_post_content(title_en: str, body_en: str, lang: str) -> tuple[str,
     return title_translated, body_translated
 
 
+def translate_post_contents(
+    title_en: str,
+    body_en: str,
+    languages: Sequence[str],
+    *,
+    max_workers: int = DEFAULT_CONCURRENCY,
+) -> list[Optional[tuple[str, str]]]:
+    """
+    Translate title and body into every language in `languages` concurrently.
+
+    All title and body requests are issued at once; no matter how many chunks
+    they split into, at most TRANSLATION_CONCURRENCY requests are in flight. Returns one entry per language, in the given order:
+    (translated_title, translated_body), or None if that language failed.
+    A failing language never aborts the others.
+    """
+    if not languages:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="translate") as pool:
+        jobs = [
+            (
+                pool.submit(translate_text, title_en, target_language=lang, kind="title"),
+                pool.submit(translate_text, body_en, target_language=lang, kind="article"),
+            )
+            for lang in languages
+        ]
+
+        results: list[Optional[tuple[str, str]]] = []
+        for lang, (title_job, body_job) in zip(languages, jobs):
+            try:
+                results.append((title_job.result(), body_job.result()))
+            except Exception as exc:
+                logger.error("Translation to %s failed; skipping that language: %s", lang, exc)
+                results.append(None)
+
+    return results